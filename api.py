@@ -7,12 +7,23 @@ various memory strategy implementations.
 
 import os
 import json
-from typing import Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
+import time
+import hashlib
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Annotated, Dict, Any, List, Optional
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+# Load environment variables (before importing modules that read settings from them)
+load_dotenv()
+
 # Import all memory strategies
 from strategy_sequential import SequentialMemory
 from strategy_sliding_window import SlidingWindowMemory
@@ -24,20 +35,51 @@ from strategy_memory_augmented import MemoryAugmentedMemory
 from strategy_graph import GraphMemory
 from strategy_os_paging import OSMemory
 from conversation_agent import AIAgent
-from memory_utils import get_openai_client
+from memory_utils import get_openai_client, count_tokens, EMBEDDING_MODEL
 from llm_provider import LLMProvider
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 # --------------------------------------------------------------------------------------
 # FastAPI App Configuration
 # --------------------------------------------------------------------------------------
 
+async def warm_up(app: FastAPI) -> None:
+    """
+    Pay cold-start costs before the first request: open the shared client's
+    connection with a dummy embedding, run the tokenizer once, and optionally
+    instantiate every strategy so their dependencies load off the hot path.
+    """
+    count_tokens("warmup")
+    app.state.oai = None
+    if not os.getenv("OPENAI_API_KEY"):
+        return
+    app.state.oai = get_openai_client()
+    try:
+        await app.state.oai.embeddings.create(model=EMBEDDING_MODEL, input="warmup")
+    except Exception:
+        logger.warning("Warm-up embedding failed", exc_info=True)
+    if os.getenv("PRELOAD_STRATEGIES") == "1":
+        for class_name in STRATEGY_CLASSES:
+            create_memory_strategy(class_name)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the shared LLM client and start the session sweeper; tear both down on shutdown."""
+    await warm_up(app)
+    sweeper = asyncio.create_task(sweep_expired_sessions())
+    yield
+    sweeper.cancel()
+    await LLMProvider.close_clients()
+    app.state.oai = None
+
 app = FastAPI(
     title="Agent Memory Playground API",
     description="Backend API for testing different AI agent memory strategies",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS for Next.js frontend
@@ -58,8 +100,71 @@ app.add_middleware(
 # Global State Management
 # --------------------------------------------------------------------------------------
 
+class SessionStore(OrderedDict):
+    """
+    Session registry with LRU eviction and idle expiry.
+
+    Reading a session marks it as most recently used. Inserting beyond
+    max_sessions evicts the least recently used entry that is not mid-turn,
+    and expire() drops entries idle for longer than idle_ttl seconds.
+    """
+
+    def __init__(self, max_sessions: int, idle_ttl: float):
+        super().__init__()
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        agent_data = super().__getitem__(session_id)
+        agent_data["last_access"] = time.monotonic()
+        self.move_to_end(session_id)
+        return agent_data
+
+    def __setitem__(self, session_id: str, agent_data: Dict[str, Any]) -> None:
+        agent_data["last_access"] = time.monotonic()
+        super().__setitem__(session_id, agent_data)
+        self.move_to_end(session_id)
+        overflow = len(self) - self.max_sessions
+        if overflow <= 0:
+            return
+        # Oldest first, skipping sessions mid-turn; if all are busy the store
+        # stays over capacity until a later insert or expire() catches up
+        evictable = [
+            other_id for other_id, other in self.items()
+            if other_id != session_id and not other["lock"].locked()
+        ][:overflow]
+        for other_id in evictable:
+            release_session(self.pop(other_id))
+
+    def expire(self) -> int:
+        """Evict idle sessions that are not mid-turn. Returns number evicted."""
+        cutoff = time.monotonic() - self.idle_ttl
+        expired = [
+            session_id for session_id, agent_data in self.items()
+            if agent_data["last_access"] < cutoff and not agent_data["lock"].locked()
+        ]
+        for session_id in expired:
+            release_session(self.pop(session_id))
+        return len(expired)
+
+
+def release_session(agent_data: Dict[str, Any]) -> None:
+    """Free the memory held by an evicted session's strategy."""
+    agent_data["agent"].memory.clear()
+
+
+async def sweep_expired_sessions(interval: float = 60.0) -> None:
+    """Periodically evict idle sessions."""
+    while True:
+        await asyncio.sleep(interval)
+        active_agents.expire()
+
+
 # Store active agent instances by session ID with metadata
-active_agents: Dict[str, Dict[str, Any]] = {}
+active_agents: SessionStore = SessionStore(
+    max_sessions=int(os.getenv("MAX_SESSIONS", "1000")),
+    idle_ttl=float(os.getenv("SESSION_TTL", "3600"))
+)
 
 # Strategy class mapping
 STRATEGY_CLASSES = {
@@ -74,20 +179,47 @@ STRATEGY_CLASSES = {
     "OSMemory": OSMemory,
 }
 
+# Strategies whose constructor takes an LLM client
+STRATEGIES_NEEDING_CLIENT = frozenset({
+    "RetrievalMemory",
+    "SummarizationMemory",
+    "GraphMemory",
+    "HierarchicalMemory",
+    "MemoryAugmentedMemory",
+    "CompressionMemory",
+})
+
+# Count prompt tokens per turn (set REPORT_TOKENS=0 to skip and report -1)
+REPORT_TOKENS = os.getenv("REPORT_TOKENS", "1") != "0"
+
 # Load playground configuration
 with open("playground_config.json", "r") as f:
     PLAYGROUND_CONFIG = json.load(f)
 
+# Static strategies payload, serialized once and served with a stable ETag
+_STRATEGIES_BYTES = orjson.dumps(PLAYGROUND_CONFIG)
+_STRATEGIES_ETAG = f'"{hashlib.md5(_STRATEGIES_BYTES).hexdigest()}"'
+
+# Request size caps, enforced by validation before any tokenization or embedding
+MAX_MESSAGE_LENGTH = int(os.getenv("MAX_MSG", "32000"))
+MAX_SYSTEM_PROMPT_LENGTH = int(os.getenv("MAX_SYSTEM_PROMPT", "8000"))
+
 # --------------------------------------------------------------------------------------
 # Pydantic Models
 # --------------------------------------------------------------------------------------
 
+SessionId = Annotated[str, Field(pattern=r"^[A-Za-z0-9_\-]{1,64}$")]
+Message = Annotated[str, Field(max_length=MAX_MESSAGE_LENGTH)]
+SystemPrompt = Annotated[str, Field(max_length=MAX_SYSTEM_PROMPT_LENGTH)]
+
 class CreateAgentRequest(BaseModel):
-    session_id: str
+    session_id: SessionId
     strategy_type: str
     model: str = "gpt-4o-mini"
     strategy_params: Optional[Dict[str, Any]] = None
-    system_prompt: Optional[str] = """You are a helpful AI assistant.
+    # Rebuild an existing session in place; send false to get a 409 instead
+    replace: bool = True
+    system_prompt: Optional[SystemPrompt] = """You are a helpful AI assistant.
 
 IMPORTANT GUIDELINES:
 1. When answering questions, recall facts EXACTLY as stated in the memory context.
@@ -97,8 +229,8 @@ IMPORTANT GUIDELINES:
 """
 
 class ChatRequest(BaseModel):
-    session_id: str
-    message: str
+    session_id: SessionId
+    message: Message
 
 class ChatResponse(BaseModel):
     response: str
@@ -107,6 +239,11 @@ class ChatResponse(BaseModel):
     prompt_tokens: int
     context: str
 
+class BatchChatResult(BaseModel):
+    session_id: str
+    result: Optional[ChatResponse] = None
+    error: Optional[str] = None
+
 class MemoryStatsResponse(BaseModel):
     stats: Dict[str, Any]
 
@@ -134,14 +271,10 @@ def create_memory_strategy(strategy_class_name: str, params: Optional[Dict[str,
     if params is None:
         params = {}
     
-    # Get client for strategies that need it
-    client = get_openai_client()
-    
-    # Create strategy with appropriate parameters
-    if strategy_class_name in ["SummarizationMemory", "RetrievalMemory", 
-                                "CompressionMemory", "HierarchicalMemory", 
-                                "MemoryAugmentedMemory", "GraphMemory"]:
-        params["client"] = client
+    # Create strategy with appropriate parameters; only strategies that call
+    # the LLM fetch the shared client (created at startup)
+    if strategy_class_name in STRATEGIES_NEEDING_CLIENT:
+        params["client"] = getattr(app.state, "oai", None) or get_openai_client()
     
     return strategy_class(**params)
 
@@ -159,26 +292,46 @@ async def root():
     }
 
 @app.get("/api/strategies")
-async def get_strategies():
+async def get_strategies(request: Request):
     """
     Get list of all available memory strategies with their configurations.
     
+    Args:
+        request: Incoming request, checked for an If-None-Match header
+        
     Returns:
-        JSON object containing all strategy configurations
+        JSON object containing all strategy configurations, or 304 if the
+        client's cached copy is current
     """
-    return PLAYGROUND_CONFIG
+    if request.headers.get("if-none-match") == _STRATEGIES_ETAG:
+        return Response(status_code=304, headers={"ETag": _STRATEGIES_ETAG})
+    return Response(
+        _STRATEGIES_BYTES,
+        media_type="application/json",
+        headers={"ETag": _STRATEGIES_ETAG, "Cache-Control": "public, max-age=60"}
+    )
 
 @app.post("/api/agent/create")
 async def create_agent(request: CreateAgentRequest):
     """
     Create a new agent instance with specified memory strategy.
     
+    An existing agent for the same session_id is replaced, which is how the
+    playground applies config changes. With replace=false the request is
+    rejected with 409 instead.
+    
     Args:
         request: CreateAgentRequest containing session_id, strategy_type, model, and optional params
         
     Returns:
         Success message with agent configuration
     """
+    if not request.replace and request.session_id in active_agents:
+        raise HTTPException(
+            status_code=409,
+            detail="Session already exists. Delete it before creating a new agent."
+        )
+    
     try:
         # Get appropriate client based on model (reads from environment variables)
         client, provider_type = LLMProvider.get_client(request.model)
@@ -191,23 +344,9 @@ async def create_agent(request: CreateAgentRequest):
         strategy_config = PLAYGROUND_CONFIG["strategies"][strategy_id]
         class_name = strategy_config["class_name"]
         
-        # Create memory strategy instance with appropriate client
-        # Only pass client to strategies that need it
+        # Create memory strategy instance; create_memory_strategy passes the
+        # shared client to strategies in STRATEGIES_NEEDING_CLIENT
         params = request.strategy_params or {}
-        
-        # Strategies that need the client parameter
-        strategies_needing_client = [
-            "RetrievalMemory",
-            "SummarizationMemory", 
-            "GraphMemory",
-            "HierarchicalMemory",
-            "MemoryAugmentedMemory",
-            "CompressionMemory"
-        ]
-        
-        if class_name in strategies_needing_client:
-            params["client"] = client
-            
         memory_strategy = create_memory_strategy(class_name, params)
         
         # Create agent with the memory strategy and provider-specific client
@@ -223,7 +362,8 @@ async def create_agent(request: CreateAgentRequest):
             "model": request.model,
             "provider": provider_type,
             "client": client,
-            "strategy": strategy_id
+            "strategy": strategy_id,
+            "lock": asyncio.Lock()
         }
         
         return {
@@ -236,6 +376,8 @@ async def create_agent(request: CreateAgentRequest):
             "provider": provider_type
         }
     
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -263,8 +405,9 @@ async def chat(request: ChatRequest):
         agent_data = active_agents[request.session_id]
         agent = agent_data["agent"]
         
-        # Get response from agent
-        result = agent.chat(request.message, verbose=False)
+        # Serialize turns within a session; different sessions run concurrently
+        async with agent_data["lock"]:
+            result = await agent.chat(request.message, verbose=False, track_tokens=REPORT_TOKENS)
         
         return ChatResponse(
             response=result["ai_response"],
@@ -279,6 +422,72 @@ async def chat(request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
 
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Send a message to an agent and stream the response as Server-Sent Events.
+    
+    Args:
+        request: ChatRequest containing session_id and message
+        
+    Returns:
+        text/event-stream of {"delta": ...} events, followed by a final
+        {"done": true, ...} event carrying the same fields as ChatResponse
+    """
+    if request.session_id not in active_agents:
+        raise HTTPException(
+            status_code=404, 
+            detail="Agent not found. Please create an agent first."
+        )
+    
+    agent_data = active_agents[request.session_id]
+    agent = agent_data["agent"]
+    
+    async def events():
+        async with agent_data["lock"]:
+            try:
+                async for event in agent.stream_chat(request.message, track_tokens=REPORT_TOKENS):
+                    if "delta" not in event:
+                        event = {
+                            "done": True,
+                            "response": event["ai_response"],
+                            "retrieval_time": event["retrieval_time"],
+                            "generation_time": event["generation_time"],
+                            "prompt_tokens": event["prompt_tokens"],
+                            "context": event["context"]
+                        }
+                    yield b"data: " + orjson.dumps(event) + b"\n\n"
+            except Exception as e:
+                yield b"data: " + orjson.dumps({"error": f"Error processing chat: {str(e)}"}) + b"\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.post("/api/chat/batch", response_model=List[BatchChatResult])
+async def chat_batch(requests: List[ChatRequest]):
+    """
+    Send several messages concurrently, one chat turn per entry.
+    
+    Args:
+        requests: List of ChatRequest entries (session_id and message)
+        
+    Returns:
+        List of BatchChatResult in request order, each holding a response or an error
+    """
+    results = await asyncio.gather(
+        *(chat(request) for request in requests),
+        return_exceptions=True
+    )
+    
+    batch_results = []
+    for request, result in zip(requests, results):
+        if isinstance(result, HTTPException):
+            batch_results.append(BatchChatResult(session_id=request.session_id, error=str(result.detail)))
+        elif isinstance(result, Exception):
+            batch_results.append(BatchChatResult(session_id=request.session_id, error=str(result)))
+        else:
+            batch_results.append(BatchChatResult(session_id=request.session_id, result=result))
+    return batch_results
+
 @app.get("/api/agent/{session_id}/stats", response_model=MemoryStatsResponse)
 async def get_memory_stats(session_id: str):
     """
@@ -360,7 +569,10 @@ async def delete_agent(session_id: str):
         raise HTTPException(status_code=500, detail=f"Error deleting agent: {str(e)}")
 
 @app.post("/api/agent/{session_id}/system-prompt")
-async def update_system_prompt(session_id: str, system_prompt: str):
+async def update_system_prompt(
+    session_id: str,
+    system_prompt: Annotated[str, Query(max_length=MAX_SYSTEM_PROMPT_LENGTH)]
+):
     """
     Update an agent's system prompt.
     
@@ -394,4 +606,14 @@ async def update_system_prompt(session_id: str, system_prompt: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Each worker is a separate process with its own active_agents and client
+    # pool, so WORKERS > 1 needs session affinity in front of the server
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WORKERS", "1")),
+        log_level="warning"
+    )
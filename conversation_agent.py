@@ -5,12 +5,15 @@ This module contains the core AI Agent that coordinates conversation flow
 and works with different memory strategies using the strategy pattern.
 """
 
-import time
-from typing import Optional
-from openai import OpenAI
+import logging
+from time import perf_counter_ns
+from typing import AsyncIterator, Optional
+from openai import AsyncOpenAI
 
 from memory_strategy_base import BaseMemoryStrategy
-from memory_utils import generate_text, count_tokens, get_openai_client
+from memory_utils import generate_text, stream_text, count_tokens, get_openai_client
+
+logger = logging.getLogger(__name__)
 
 
 class AIAgent:
@@ -25,7 +28,7 @@ class AIAgent:
         self, 
         memory_strategy: BaseMemoryStrategy, 
         system_prompt: str = "You are a helpful AI assistant.",
-        client: Optional[OpenAI] = None
+        client: Optional[AsyncOpenAI] = None
     ):
         """
         Initialize the AI agent.
@@ -33,20 +36,36 @@ class AIAgent:
         Args:
             memory_strategy: Instance of a class inheriting from BaseMemoryStrategy
             system_prompt: Initial instructions for the LLM defining its personality
-            client: Optional OpenAI client instance
+            client: Optional AsyncOpenAI client instance
         """
         self.memory = memory_strategy
+        self.strategy_name = type(memory_strategy).__name__
+        # Strategy capabilities, probed once instead of on every turn
+        self._has_buffer = hasattr(memory_strategy, "full_history_buffer")
+        self._has_graph = hasattr(memory_strategy, "knowledge_graph")
+        self._has_prompt_tokens = hasattr(memory_strategy, "total_prompt_tokens")
         self.system_prompt = system_prompt
+        self._sys_tokens = count_tokens(system_prompt)
         self.client = client or get_openai_client()
-        print(f"Agent initialized with {type(memory_strategy).__name__}.")
+        print(f"Agent initialized with {self.strategy_name}.")
+    
+    @staticmethod
+    def _build_user_prompt(context: str, user_input: str) -> str:
+        """Combine retrieved memory context and the user's message into the LLM prompt."""
+        return f"### MEMORY CONTEXT\n{context}\n\n### CURRENT REQUEST\n{user_input}"
+    
+    def _count_prompt_tokens(self, full_user_prompt: str) -> int:
+        """Count prompt tokens without concatenating the system and user prompts."""
+        return self._sys_tokens + count_tokens(full_user_prompt)
     
-    def chat(self, user_input: str, verbose: bool = True) -> dict:
+    async def chat(self, user_input: str, verbose: bool = True, track_tokens: bool = True) -> dict:
         """
         Process a single conversation turn.
         
         Args:
             user_input: The user's latest message
             verbose: Whether to print detailed debug information
+            track_tokens: Whether to count prompt tokens (reported as -1 when disabled)
             
         Returns:
             Dictionary containing response and performance metrics
@@ -56,27 +75,29 @@ class AIAgent:
             print(f"User > {user_input}")
         
         # Step 1: Retrieve context from the agent's memory strategy
-        start_time = time.time()
-        context = self.memory.get_context(query=user_input)
-        retrieval_time = time.time() - start_time
+        start_time = perf_counter_ns()
+        context = await self.memory.get_context(query=user_input)
+        retrieval_time = (perf_counter_ns() - start_time) / 1e9
         
         # Debug logging for memory state
-        strategy_name = type(self.memory).__name__
-        print(f"[DEBUG {strategy_name}] Context length: {len(context)} chars")
-        print(f"[DEBUG {strategy_name}] Context contains 'Alice': {'Alice' in context}")
-        print(f"[DEBUG {strategy_name}] Context contains 'Bob': {'Bob' in context}")
-        if hasattr(self.memory, 'full_history_buffer'):
-            print(f"[DEBUG {strategy_name}] History buffer size: {len(self.memory.full_history_buffer)} messages")
-        if hasattr(self.memory, 'knowledge_graph'):
-            print(f"[DEBUG {strategy_name}] Graph nodes: {self.memory.knowledge_graph.number_of_nodes()}")
-            print(f"[DEBUG {strategy_name}] Graph edges: {self.memory.knowledge_graph.number_of_edges()}")
-        print(f"[DEBUG {strategy_name}] Context preview: {context[:300]}...")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            strategy_name = self.strategy_name
+            logger.debug("[%s] Context length: %d chars", strategy_name, len(context))
+            logger.debug("[%s] Context contains 'Alice': %s", strategy_name, 'Alice' in context)
+            logger.debug("[%s] Context contains 'Bob': %s", strategy_name, 'Bob' in context)
+            if self._has_buffer:
+                logger.debug("[%s] History buffer size: %d messages", strategy_name, len(self.memory.full_history_buffer))
+            if self._has_graph:
+                logger.debug("[%s] Graph nodes: %d", strategy_name, self.memory.knowledge_graph.number_of_nodes())
+                logger.debug("[%s] Graph edges: %d", strategy_name, self.memory.knowledge_graph.number_of_edges())
+            logger.debug("[%s] Context preview: %.300s...", strategy_name, context)
         
         # Step 2: Build complete prompt for the LLM
-        full_user_prompt = f"### MEMORY CONTEXT\n{context}\n\n### CURRENT REQUEST\n{user_input}"
+        full_user_prompt = self._build_user_prompt(context, user_input)
         
         # Step 3: Calculate token usage for debugging
-        prompt_tokens = count_tokens(self.system_prompt + full_user_prompt)
+        prompt_tokens = self._count_prompt_tokens(full_user_prompt) if track_tokens else -1
         
         if verbose:
             print("\n--- Agent Debug Info ---")
@@ -85,26 +106,29 @@ class AIAgent:
             print(f"\n[Context Retrieved]:\n{context}\n")
         
         # Step 4: Call LLM to get response
-        start_time = time.time()
-        ai_response = generate_text(self.system_prompt, full_user_prompt, self.client)
-        generation_time = time.time() - start_time
+        start_time = perf_counter_ns()
+        ai_response = await generate_text(self.system_prompt, full_user_prompt, self.client)
+        generation_time = (perf_counter_ns() - start_time) / 1e9
         
         # Step 5: Update memory with the latest interaction
-        self.memory.add_message(user_input, ai_response)
+        await self.memory.add_message(user_input, ai_response)
         
         # Debug logging after memory update
-        strategy_name = type(self.memory).__name__
-        print(f"[DEBUG {strategy_name}] Memory updated with new turn")
-        if hasattr(self.memory, 'full_history_buffer'):
-            print(f"[DEBUG {strategy_name}] Total messages in buffer: {len(self.memory.full_history_buffer)}")
-            if len(self.memory.full_history_buffer) > 0:
-                print(f"[DEBUG {strategy_name}] First message: {self.memory.full_history_buffer[0]}")
-                print(f"[DEBUG {strategy_name}] Last message: {self.memory.full_history_buffer[-1]}")
-        if hasattr(self.memory, 'knowledge_graph'):
-            print(f"[DEBUG {strategy_name}] Graph now has {self.memory.knowledge_graph.number_of_nodes()} nodes, {self.memory.knowledge_graph.number_of_edges()} edges")
+        if debug:
+            logger.debug("[%s] Memory updated with new turn", strategy_name)
+            if self._has_buffer:
+                logger.debug("[%s] Total messages in buffer: %d", strategy_name, len(self.memory.full_history_buffer))
+                if len(self.memory.full_history_buffer) > 0:
+                    logger.debug("[%s] First message: %s", strategy_name, self.memory.full_history_buffer[0])
+                    logger.debug("[%s] Last message: %s", strategy_name, self.memory.full_history_buffer[-1])
+            if self._has_graph:
+                logger.debug(
+                    "[%s] Graph now has %d nodes, %d edges", strategy_name,
+                    self.memory.knowledge_graph.number_of_nodes(), self.memory.knowledge_graph.number_of_edges()
+                )
         
         # Step 6: Update prompt token tracking if memory strategy supports it
-        if hasattr(self.memory, 'total_prompt_tokens'):
+        if track_tokens and self._has_prompt_tokens:
             self.memory.total_prompt_tokens += prompt_tokens
         
         # Step 7: Display AI response and performance metrics
@@ -122,6 +146,50 @@ class AIAgent:
             "context": context
         }
     
+    async def stream_chat(self, user_input: str, track_tokens: bool = True) -> AsyncIterator[dict]:
+        """
+        Process a single conversation turn, streaming the response as it is generated.
+        
+        Memory is updated once with the full response after the stream ends.
+        If the provider stream fails, the error propagates and memory is left
+        untouched, so a partial reply is never stored.
+        
+        Args:
+            user_input: The user's latest message
+            track_tokens: Whether to count prompt tokens (reported as -1 when disabled)
+            
+        Yields:
+            {"delta": text} for each response chunk, then a final dictionary
+            with the full response and performance metrics
+        """
+        start_time = perf_counter_ns()
+        context = await self.memory.get_context(query=user_input)
+        retrieval_time = (perf_counter_ns() - start_time) / 1e9
+        
+        full_user_prompt = self._build_user_prompt(context, user_input)
+        prompt_tokens = self._count_prompt_tokens(full_user_prompt) if track_tokens else -1
+        
+        start_time = perf_counter_ns()
+        chunks = []
+        async for delta in stream_text(self.system_prompt, full_user_prompt, self.client):
+            chunks.append(delta)
+            yield {"delta": delta}
+        generation_time = (perf_counter_ns() - start_time) / 1e9
+        ai_response = "".join(chunks)
+        
+        await self.memory.add_message(user_input, ai_response)
+        if track_tokens and self._has_prompt_tokens:
+            self.memory.total_prompt_tokens += prompt_tokens
+        
+        yield {
+            "user_input": user_input,
+            "ai_response": ai_response,
+            "retrieval_time": retrieval_time,
+            "generation_time": generation_time,
+            "prompt_tokens": prompt_tokens,
+            "context": context
+        }
+    
     def get_memory_stats(self) -> dict:
         """
         Get current memory statistics.
@@ -146,4 +214,5 @@ class AIAgent:
             new_prompt: New system prompt to use
         """
         self.system_prompt = new_prompt
+        self._sys_tokens = count_tokens(new_prompt)
         print(f"System prompt updated to: {new_prompt[:50]}...")
@@ -7,17 +7,181 @@ API keys are read from environment variables.
 """
 
 import os
-from typing import Tuple, Any
-from openai import OpenAI
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import httpx
+from openai import AsyncOpenAI
+
+# Long-lived clients shared by every agent and strategy, keyed by (provider, api_key)
+_CLIENT_CACHE: Dict[Tuple[str, str], Any] = {}
+
+# Raw HTTP transports behind the cached clients, used by the OpenAI fast path
+_HTTP_CLIENTS: Dict[Tuple[str, str], httpx.AsyncClient] = {}
+
+# Post chat completions directly instead of going through the OpenAI SDK
+OPENAI_FAST_PATH = os.getenv("OPENAI_FAST_PATH", "1") != "0"
+
+# Connection pool sizing for the provider HTTP clients (per worker process)
+POOL_SIZE = int(os.getenv("OAI_POOL_SIZE", "100"))
+KEEPALIVE_EXPIRY = 90.0
+
+# Fast-path retry backoff (seconds); attempts follow the client's max_retries like the SDK
+RETRY_INITIAL_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+# Longest server-requested Retry-After honored before falling back to our own backoff
+RETRY_AFTER_MAX = 60.0
+
+
+def _new_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP transport used underneath the provider SDKs."""
+    limits = httpx.Limits(
+        max_connections=POOL_SIZE,
+        max_keepalive_connections=max(1, POOL_SIZE // 2),
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+    return httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(60.0, connect=10.0))
+
+
+def _record_usage(usage: Dict[str, int], prompt_tokens: int, completion_tokens: int, cached_tokens: Optional[int]) -> None:
+    """Fill a caller-supplied usage dict with a response's token counts."""
+    usage["prompt_tokens"] = prompt_tokens or 0
+    usage["completion_tokens"] = completion_tokens or 0
+    usage["cached_tokens"] = cached_tokens or 0
+
+
+def _should_retry(response: httpx.Response) -> bool:
+    """Whether a fast-path response is retryable, using the same rules as the OpenAI SDK."""
+    should_retry = response.headers.get("x-should-retry")
+    if should_retry in ("true", "false"):
+        return should_retry == "true"
+    return response.status_code in (408, 409, 429) or response.status_code >= 500
+
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+    """Seconds to wait before the next attempt, honoring the server's Retry-After when sensible."""
+    if response is not None:
+        retry_after = None
+        try:
+            if "retry-after-ms" in response.headers:
+                retry_after = float(response.headers["retry-after-ms"]) / 1000
+            elif "retry-after" in response.headers:
+                header = response.headers["retry-after"]
+                try:
+                    retry_after = float(header)
+                except ValueError:
+                    retry_after = parsedate_to_datetime(header).timestamp() - time.time()
+        except (TypeError, ValueError):
+            retry_after = None
+        if retry_after is not None and 0 < retry_after <= RETRY_AFTER_MAX:
+            return retry_after
+    delay = min(RETRY_INITIAL_DELAY * 2 ** attempt, RETRY_MAX_DELAY)
+    return delay * (1 - 0.25 * random.random())
+
+
+async def _openai_fast_completion(
+    http_client: httpx.AsyncClient,
+    client: AsyncOpenAI,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float,
+    max_tokens: int,
+    usage: Optional[Dict[str, int]] = None
+) -> str:
+    """
+    POST to the chat completions endpoint and return the message content.
+
+    Sends the client's own headers (organization, project, custom defaults) and
+    retries connection errors and 408/409/429/5xx responses up to the client's
+    max_retries, with exponential backoff or the server's Retry-After.
+    """
+    url = str(client.base_url).rstrip("/") + "/chat/completions"
+    # The SDK marks unset headers with Omit sentinels; only real values go on the wire
+    headers = {name: value for name, value in client.default_headers.items() if isinstance(value, str)}
+    headers["Authorization"] = f"Bearer {client.api_key}"
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens
+    }
+    max_retries = client.max_retries
+    for attempt in range(max_retries + 1):
+        try:
+            response = await http_client.post(url, headers=headers, json=payload)
+        except httpx.TransportError:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(_retry_delay(None, attempt))
+            continue
+        if attempt < max_retries and _should_retry(response):
+            await asyncio.sleep(_retry_delay(response, attempt))
+            continue
+        break
+    response.raise_for_status()
+    body = response.json()
+    if usage is not None and body.get("usage"):
+        reported = body["usage"]
+        _record_usage(
+            usage,
+            reported.get("prompt_tokens", 0),
+            reported.get("completion_tokens", 0),
+            (reported.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+        )
+    return body["choices"][0]["message"]["content"]
 
 
 class LLMProvider:
-    """Factory for creating appropriate LLM clients"""
+    """Factory for creating appropriate async LLM clients"""
+
+    @staticmethod
+    def get_shared_client(provider_type: str, api_key: str) -> Any:
+        """
+        Return the cached client for a provider/API key pair, creating it on first use.
+
+        Args:
+            provider_type: Type of provider ("openai", "anthropic")
+            api_key: API key the client authenticates with
+
+        Returns:
+            Shared async client instance
+        """
+        key = (provider_type, api_key)
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            http_client = _new_http_client()
+            if provider_type == "openai":
+                client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+            elif provider_type == "anthropic":
+                import anthropic
+                client = anthropic.AsyncAnthropic(api_key=api_key, http_client=http_client)
+            else:
+                raise ValueError(f"Unknown provider: {provider_type}")
+            _CLIENT_CACHE[key] = client
+            _HTTP_CLIENTS[key] = http_client
+        return client
+
+    @staticmethod
+    async def close_clients() -> None:
+        """Close every cached client and release its connection pool."""
+        clients = list(_CLIENT_CACHE.values())
+        _CLIENT_CACHE.clear()
+        _HTTP_CLIENTS.clear()
+        for client in clients:
+            await client.close()
 
     @staticmethod
     def get_client(model: str) -> Tuple[Any, str]:
         """
-        Returns appropriate client based on model name
+        Returns appropriate async client based on model name.
+        Clients are cached per provider and API key, so repeated calls
+        reuse the same connection pool.
 
         Args:
             model: Model identifier (e.g., "gpt-4", "claude-3-5-sonnet")
@@ -38,7 +202,7 @@ class LLMProvider:
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY environment variable not set")
-            return OpenAI(api_key=api_key), "openai"
+            return LLMProvider.get_shared_client("openai", api_key), "openai"
 
         # Anthropic models
         elif "claude" in model_lower:
@@ -46,8 +210,7 @@ class LLMProvider:
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY environment variable not set")
             try:
-                import anthropic
-                return anthropic.Anthropic(api_key=api_key), "anthropic"
+                return LLMProvider.get_shared_client("anthropic", api_key), "anthropic"
             except ImportError:
                 raise ValueError("Anthropic package not installed. Run: pip install anthropic")
 
@@ -69,20 +232,22 @@ class LLMProvider:
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY environment variable not set for Mistral/Llama models")
-            return OpenAI(api_key=api_key), "openai"
+            return LLMProvider.get_shared_client("openai", api_key), "openai"
 
         else:
             raise ValueError(f"Unknown model provider for: {model}")
 
     @staticmethod
-    def generate_text(
+    async def generate_text(
         client: Any,
         provider_type: str,
         model: str,
         system_prompt: str,
         user_prompt: str,
         temperature: float = 0.7,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        static_prefix: str = "",
+        usage: Optional[Dict[str, int]] = None
     ) -> str:
         """
         Generate text using the appropriate provider's API
@@ -95,13 +260,29 @@ class LLMProvider:
             user_prompt: User input
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
+            static_prefix: Fixed instructions placed before the user input. Anthropic
+                receives it as a cache_control block; other providers get it prepended,
+                so their automatic prefix caching can reuse it
+            usage: Optional dict filled with prompt_tokens, completion_tokens and
+                cached_tokens (prompt tokens served from the provider's prompt cache)
 
         Returns:
             Generated text response
         """
         try:
+            if static_prefix and provider_type != "anthropic":
+                user_prompt = static_prefix + user_prompt
+
             if provider_type == "openai":
-                response = client.chat.completions.create(
+                key = ("openai", getattr(client, "api_key", None))
+                http_client = _HTTP_CLIENTS.get(key)
+                if OPENAI_FAST_PATH and http_client is not None and _CLIENT_CACHE.get(key) is client:
+                    return await _openai_fast_completion(
+                        http_client, client, model,
+                        system_prompt, user_prompt,
+                        temperature, max_tokens, usage
+                    )
+                response = await client.chat.completions.create(
                     model=model,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -110,24 +291,45 @@ class LLMProvider:
                     temperature=temperature,
                     max_tokens=max_tokens
                 )
+                if usage is not None and response.usage is not None:
+                    details = getattr(response.usage, "prompt_tokens_details", None)
+                    _record_usage(
+                        usage,
+                        response.usage.prompt_tokens,
+                        response.usage.completion_tokens,
+                        getattr(details, "cached_tokens", 0)
+                    )
                 return response.choices[0].message.content
 
             elif provider_type == "anthropic":
-                response = client.messages.create(
+                content = user_prompt
+                if static_prefix:
+                    content = [
+                        {"type": "text", "text": static_prefix, "cache_control": {"type": "ephemeral"}},
+                        {"type": "text", "text": user_prompt}
+                    ]
+                response = await client.messages.create(
                     model=model,
                     max_tokens=max_tokens,
                     system=system_prompt,
                     messages=[
-                        {"role": "user", "content": user_prompt}
+                        {"role": "user", "content": content}
                     ],
                     temperature=temperature
                 )
+                if usage is not None:
+                    _record_usage(
+                        usage,
+                        response.usage.input_tokens,
+                        response.usage.output_tokens,
+                        getattr(response.usage, "cache_read_input_tokens", 0)
+                    )
                 return response.content[0].text
 
             elif provider_type == "google":
                 model_obj = client.GenerativeModel(model)
                 prompt = f"{system_prompt}\n\n{user_prompt}"
-                response = model_obj.generate_content(prompt)
+                response = await model_obj.generate_content_async(prompt)
                 return response.text
 
             else:
@@ -135,3 +337,70 @@ class LLMProvider:
 
         except Exception as e:
             return f"Error generating text: {str(e)}"
+
+    @staticmethod
+    async def stream_text(
+        client: Any,
+        provider_type: str,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1000
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text from the appropriate provider's API
+
+        Args:
+            client: The provider's client instance
+            provider_type: Type of provider ("openai", "anthropic", "google")
+            model: Model identifier
+            system_prompt: System instructions
+            user_prompt: User input
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Yields:
+            Text deltas as they arrive
+
+        Raises:
+            Exception: Provider errors, raised rather than yielded as text
+        """
+        if provider_type == "openai":
+            stream = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        elif provider_type == "anthropic":
+            async with client.messages.stream(
+                model=model,
+                max_tokens=max_tokens,
+                system=system_prompt,
+                messages=[
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature
+            ) as stream:
+                async for text in stream.text_stream:
+                    yield text
+
+        elif provider_type == "google":
+            model_obj = client.GenerativeModel(model)
+            prompt = f"{system_prompt}\n\n{user_prompt}"
+            response = await model_obj.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                yield chunk.text
+
+        else:
+            raise ValueError(f"Unknown provider: {provider_type}")
+
@@ -6,7 +6,8 @@ It ensures consistency and interchangeability between different memory optimizat
 """
 
 import abc
-from typing import Any, Dict, List, Optional
+import os
+from typing import Any, ClassVar, Dict, List, Optional
 
 
 class BaseMemoryStrategy(abc.ABC):
@@ -21,8 +22,14 @@ class BaseMemoryStrategy(abc.ABC):
     UI_COLOR: str = "#CCCCCC"
     UI_ICON: str = ""
 
+    # Whether _log_operation records entries; set OPERATION_LOG=0 to skip the per-turn bookkeeping
+    LOGGING_ENABLED: ClassVar[bool] = os.getenv("OPERATION_LOG", "1") != "0"
+
+    # Empty so subclasses that declare __slots__ get no per-instance __dict__
+    __slots__ = ()
+
     @abc.abstractmethod
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
         Add a new user-AI interaction to the memory storage.
         
@@ -33,7 +40,7 @@ class BaseMemoryStrategy(abc.ABC):
         pass
     
     @abc.abstractmethod
-    def get_context(self, query: str) -> str:
+    async def get_context(self, query: str) -> str:
         """
         Retrieve and format relevant context from memory for the LLM.
         
@@ -7,9 +7,13 @@ including text generation, embedding generation, and token counting.
 
 import os
 import time
+import hashlib
 import tiktoken
-from typing import List, Optional, Any
-from openai import OpenAI
+from array import array
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Any, Sequence, Tuple, Union
+from openai import AsyncOpenAI
 
 # Initialize tokenizer for token counting
 tokenizer = tiktoken.get_encoding("cl100k_base")
@@ -18,27 +22,48 @@ tokenizer = tiktoken.get_encoding("cl100k_base")
 GENERATION_MODEL = "gpt-4o-mini"
 EMBEDDING_MODEL = "text-embedding-3-small"
 
+# Rendered prefix per message role, shared by the strategies that format messages
+ROLE_PREFIX = {"user": "User: ", "assistant": "Assistant: "}
 
-def get_openai_client() -> OpenAI:
+# Stored conversation message; a tuple is far smaller than the equivalent dict
+Message = namedtuple("Message", "role content formatted token_count", defaults=(None,))
+
+# Strings up to this length have their token counts memoized
+TOKEN_COUNT_CACHE_MAX_CHARS = 8192
+
+# Batches smaller than this are tokenized serially; a thread pool costs more than it saves
+TOKEN_BATCH_PARALLEL_MIN = 64
+
+# LRU cache of embeddings shared across sessions, keyed by (model, text digest)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "2048"))
+_embedding_cache: "OrderedDict[Tuple[str, bytes], array]" = OrderedDict()
+
+
+def get_openai_client() -> AsyncOpenAI:
     """
-    Initialize and return OpenAI client with API key from environment.
+    Return the shared async OpenAI client for the API key in the environment.
     
     Returns:
-        Configured OpenAI client instance
+        Configured AsyncOpenAI client instance
     """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY not found in environment variables")
     
-    return OpenAI(api_key=api_key)
+    # Import here to avoid circular dependency
+    from llm_provider import LLMProvider
+    
+    return LLMProvider.get_shared_client("openai", api_key)
 
 
-def generate_text(
+async def generate_text(
     system_prompt: str, 
     user_prompt: str, 
     client: Optional[Any] = None,
     provider_type: str = "openai",
-    model: str = "gpt-4o-mini"
+    model: str = "gpt-4o-mini",
+    static_prefix: str = "",
+    usage: Optional[Dict[str, int]] = None
 ) -> str:
     """
     Generate text response using the LLM API.
@@ -50,6 +75,10 @@ def generate_text(
         client: Optional client instance (OpenAI, Anthropic, or Google)
         provider_type: Provider type ("openai", "anthropic", "google")
         model: Model identifier
+        static_prefix: Fixed instructions sent ahead of user_prompt and marked
+            for provider-side prompt caching
+        usage: Optional dict filled with the response's prompt, completion and
+            cached prompt token counts
         
     Returns:
         Generated text content from the AI
@@ -62,48 +91,162 @@ def generate_text(
     # Import here to avoid circular dependency
     from llm_provider import LLMProvider
     
-    return LLMProvider.generate_text(
+    return await LLMProvider.generate_text(
         client, provider_type, model,
-        system_prompt, user_prompt
+        system_prompt, user_prompt,
+        static_prefix=static_prefix,
+        usage=usage
     )
 
 
-def generate_embedding(text: str, client: Optional[OpenAI] = None) -> List[float]:
+async def stream_text(
+    system_prompt: str,
+    user_prompt: str,
+    client: Optional[Any] = None,
+    provider_type: str = "openai",
+    model: str = "gpt-4o-mini"
+) -> AsyncIterator[str]:
     """
-    Generate embedding vector for given text using the embedding model.
+    Stream a text response from the LLM API, one delta at a time.
+    Supports multiple providers through LLMProvider.
     
     Args:
-        text: Input text to convert to embedding vector
-        client: Optional OpenAI client instance
+        system_prompt: System instructions defining AI role and behavior
+        user_prompt: User input that AI should respond to
+        client: Optional client instance (OpenAI, Anthropic, or Google)
+        provider_type: Provider type ("openai", "anthropic", "google")
+        model: Model identifier
         
-    Returns:
-        List of floats representing the embedding vector
+    Yields:
+        Generated text deltas as they arrive
     """
     if client is None:
         client = get_openai_client()
+        provider_type = "openai"
+        model = GENERATION_MODEL
+    
+    # Import here to avoid circular dependency
+    from llm_provider import LLMProvider
+    
+    async for delta in LLMProvider.stream_text(
+        client, provider_type, model,
+        system_prompt, user_prompt
+    ):
+        yield delta
+
+
+def _embedding_cache_key(text: str) -> Tuple[str, bytes]:
+    """Build the embedding cache key for a text."""
+    return (EMBEDDING_MODEL, hashlib.blake2b(text.encode(), digest_size=16).digest())
+
+
+async def generate_embedding(
+    text: Union[str, List[str]],
+    client: Optional[AsyncOpenAI] = None
+) -> Union[Sequence[float], List[Sequence[float]]]:
+    """
+    Generate embedding vector for given text using the embedding model.
+    
+    Results are cached by text, so repeated texts skip the API call. A list
+    of texts is embedded with a single request for all uncached entries.
+    Vectors are packed float32 arrays, which NumPy wraps without copying.
+    
+    Args:
+        text: Input text (or list of texts) to convert to embedding vectors
+        client: Optional AsyncOpenAI client instance
+        
+    Returns:
+        Float32 array representing the embedding vector, or one such array
+        per input text when given a list (empty lists on failure)
+    """
+    texts = [text] if isinstance(text, str) else list(text)
+    keys = [_embedding_cache_key(t) for t in texts]
+    embeddings: List[Sequence[float]] = []
+    missing = []
+    for i, key in enumerate(keys):
+        cached = _embedding_cache.get(key)
+        if cached is not None:
+            _embedding_cache.move_to_end(key)
+        else:
+            missing.append(i)
+        embeddings.append(cached or [])
     
-    try:
-        response = client.embeddings.create(
-            model=EMBEDDING_MODEL,
-            input=text
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"Error generating embedding: {str(e)}")
-        return []
+    if missing:
+        if client is None:
+            client = get_openai_client()
+        try:
+            response = await client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=[texts[i] for i in missing]
+            )
+            for i, item in zip(missing, response.data):
+                embeddings[i] = _embedding_cache[keys[i]] = array("f", item.embedding)
+            while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+        except Exception as e:
+            print(f"Error generating embedding: {str(e)}")
+    
+    return embeddings[0] if isinstance(text, str) else embeddings
+
+
+@lru_cache(maxsize=4096)
+def _cached_count_tokens(text: str) -> int:
+    """Memoized token count for short, frequently repeated strings."""
+    return len(tokenizer.encode_ordinary(text))
 
 
 def count_tokens(text: str) -> int:
     """
     Count the number of tokens in the given text string.
     
+    Counts for short strings are memoized, so repeated texts (system prompts,
+    stored turns) skip re-tokenization. Long strings are always tokenized
+    directly to keep them out of the cache.
+    
     Args:
         text: String to tokenize and count
         
     Returns:
         Integer count of tokens
     """
-    return len(tokenizer.encode(text))
+    if len(text) <= TOKEN_COUNT_CACHE_MAX_CHARS:
+        return _cached_count_tokens(text)
+    return len(tokenizer.encode_ordinary(text))
+
+
+def count_tokens_batch(texts: List[str]) -> List[int]:
+    """
+    Count tokens for many strings.
+    
+    Small batches go through count_tokens (and its memo cache) one string at
+    a time. Large ones use the tokenizer's threaded batch encoder, with no
+    more threads than there are strings.
+    
+    Args:
+        texts: Strings to tokenize and count
+        
+    Returns:
+        Token counts in the same order as the input
+    """
+    if len(texts) < TOKEN_BATCH_PARALLEL_MIN:
+        return [count_tokens(text) for text in texts]
+    num_threads = min(len(texts), os.cpu_count() or 1)
+    return [len(tokens) for tokens in tokenizer.encode_ordinary_batch(texts, num_threads=num_threads)]
+
+
+def make_message(role: str, content: str, token_count: Optional[int] = None) -> Message:
+    """
+    Build a stored message with its rendered "Role: content" line.
+    
+    Args:
+        role: "user" or "assistant"
+        content: Message text
+        token_count: Token count of the content, if already known
+        
+    Returns:
+        Message tuple
+    """
+    return Message(role, content, ROLE_PREFIX[role] + content, token_count)
 
 
 def format_conversation_turn(user_input: str, ai_response: str) -> str:
@@ -6,11 +6,128 @@ algorithms, significantly reducing storage space and processing overhead while
 retaining key information through multi-level compression mechanisms.
 """
 
+import re
 import time
+import hashlib
+import asyncio
+import logging
+import numpy as np
+from array import array
+from collections import OrderedDict, deque
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from openai import AsyncOpenAI
 from memory_strategy_base import BaseMemoryStrategy
-from memory_utils import generate_text, get_openai_client, count_tokens
+from memory_utils import generate_text, generate_embedding, get_openai_client, count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Fixed scoring instructions, sent ahead of the turns so providers can cache them
+_SCORING_INSTRUCTIONS = (
+    "Rate the importance of this conversation turn on a scale of 0.0 to 1.0. "
+    "Consider factors like: factual information, user preferences, decisions, "
+    "emotional significance, and future relevance. "
+    "Respond with only a number between 0.0 and 1.0.\n\n"
+)
+_BATCH_SCORING_INSTRUCTIONS = (
+    "Rate the importance of each of the conversation turns below on a scale of 0.0 to 1.0. "
+    "Consider factors like: factual information, user preferences, decisions, "
+    "emotional significance, and future relevance. "
+    "Respond with exactly one line per turn in the form '<turn number>) <score>'.\n\n"
+)
+
+_CONSOLIDATION_INSTRUCTIONS = (
+    "Merge the following memories into one concise summary. Keep every specific fact, "
+    "name, number, preference, and decision; drop repetition and small talk.\n\n"
+)
+
+# Leading number in [0, 1] in a single-turn scoring response, e.g. "Score: 0.8.".
+# Anchored so digits in status codes or "7/10" style replies don't parse as a score
+_SCORE = re.compile(r"^\D*?([01](?:\.\d+)?|0?\.\d+)\b")
+# Score used when the LLM reply can't be parsed or the provider call failed; never cached
+FALLBACK_SCORE = 0.5
+
+# Utterances that carry no information worth an LLM scoring call
+_TRIVIAL_UTTERANCE = re.compile(r"(ok|okay|thanks|thank you|yes|no|hi|hello|\W*)", re.I)
+TRIVIAL_TURN_CHARS = 40
+TRIVIAL_TURN_SCORE = 0.2
+
+# Most recent operations kept in the operation log
+OPERATION_LOG_SIZE = 10_000
+
+# Compressed summaries kept for replay of identical segment groups
+SUMMARY_CACHE_SIZE = 1024
+
+# One "<n>) <score>" line per turn in a batched importance scoring response
+_BATCH_SCORE_LINE = re.compile(r"^\s*\d+[).:\s]+([01]?\.\d+|[01])\s*$", re.M)
+
+
+class _SemanticCache:
+    """
+    Embedding-keyed cache for LLM outputs.
+
+    A lookup hits when the cosine similarity between the query embedding and
+    a stored embedding reaches the threshold. Entries are evicted least
+    recently used once the cache is full.
+    """
+
+    def __init__(self, threshold: float = 0.92, capacity: int = 10_000):
+        self.threshold = threshold
+        self.capacity = capacity
+        self._matrix: Optional[np.ndarray] = None
+        self._values: List[Any] = []
+        self._last_used = np.zeros(0, dtype=np.int64)
+        self._tick = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def get(self, embedding: List[float]) -> Optional[Any]:
+        """Return the cached value for the closest stored embedding, if similar enough."""
+        n = len(self._values)
+        q = self._normalize(embedding) if embedding else None
+        if n == 0 or q is None:
+            return None
+        sims = self._matrix[:n] @ q
+        best = int(np.argmax(sims))
+        if sims[best] < self.threshold:
+            return None
+        self._tick += 1
+        self._last_used[best] = self._tick
+        return self._values[best]
+
+    def put(self, embedding: List[float], value: Any) -> None:
+        """Store a value under an embedding, evicting the least recently used entry when full."""
+        q = self._normalize(embedding) if embedding else None
+        if q is None:
+            return
+        n = len(self._values)
+        if self._matrix is None:
+            self._matrix = np.empty((min(64, self.capacity), q.shape[0]), dtype=np.float32)
+            self._last_used = np.zeros(self._matrix.shape[0], dtype=np.int64)
+        elif n == self._matrix.shape[0] and n < self.capacity:
+            # Grow geometrically so the matrix is only as large as the cache
+            rows = min(2 * n, self.capacity)
+            self._matrix = np.concatenate([self._matrix, np.empty((rows - n, self._matrix.shape[1]), dtype=np.float32)])
+            self._last_used = np.concatenate([self._last_used, np.zeros(rows - n, dtype=np.int64)])
+        if n < self.capacity:
+            row = n
+            self._values.append(value)
+        else:
+            row = int(np.argmin(self._last_used))
+            self._values[row] = value
+        self._matrix[row] = q
+        self._tick += 1
+        self._last_used[row] = self._tick
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._matrix = None
+        self._values = []
+        self._last_used = np.zeros(0, dtype=np.int64)
+        self._tick = 0
 
 
 class CompressionMemory(BaseMemoryStrategy):
@@ -42,7 +159,9 @@ class CompressionMemory(BaseMemoryStrategy):
         self,
         compression_ratio: float = 0.5,
         importance_threshold: float = 0.7,
-        client: Optional[OpenAI] = None
+        mtm_budget: int = 4096,
+        ltm_budget: int = 16384,
+        client: Optional[AsyncOpenAI] = None
     ):
         """
         Initialize compression memory system.
@@ -50,24 +169,46 @@ class CompressionMemory(BaseMemoryStrategy):
         Args:
             compression_ratio: Target compression ratio (0.5 = 50% compression)
             importance_threshold: Threshold for importance scoring (0-1)
-            client: Optional OpenAI client instance
+            mtm_budget: Uncompressed segment tokens that trigger a compression cycle
+            ltm_budget: Archive tokens that trigger consolidation of the oldest entries
+            client: Optional AsyncOpenAI client instance
         """
         self.compression_ratio = compression_ratio
         self.importance_threshold = importance_threshold
+        self.mtm_budget = mtm_budget
+        self.ltm_budget = ltm_budget
         self.client = client or get_openai_client()
         self.segment_pool: List[Dict[str, Any]] = []
+        self._pool_tokens = 0
+        # The last few pooled segments, shown verbatim by get_context
+        self._recent_segments: deque = deque(maxlen=3)
         self.compressed_archive: List[Dict[str, Any]] = []
-        self.importance_distribution: List[float] = []
+        self._archive_tokens = 0
+        # Inverted index of lowercase word -> positions in compressed_archive,
+        # kept as C int arrays so queries hand numpy raw buffers
+        self._archive_index: Dict[str, array] = {}
+        # Scored importances in a growable buffer, with running sum and bucket counts
+        self._scores = np.empty(1024, dtype=np.float32)
+        self._score_count = 0
+        self._score_sum = 0.0
+        self._score_buckets = {"high": 0, "medium": 0, "low": 0}
         self.compression_events: List[Dict[str, Any]] = []
         self.compression_stats = {
             "original_tokens": 0,
             "compressed_tokens": 0,
             "compression_count": 0
         }
-        self.operation_log: List[Dict[str, Any]] = []
+        self.operation_log: deque = deque(maxlen=OPERATION_LOG_SIZE)
+        # Near-duplicate turns reuse earlier scores; summaries are only reused for
+        # identical segment groups, since similar text can differ in the facts kept
+        self._score_cache = _SemanticCache()
+        self._summary_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self.scoring_counts = {"short_circuited": 0, "parsed": 0, "fallback": 0}
 
     def _log_operation(self, op_type: str, details: Dict[str, Any]) -> None:
         """Log operation with [COMPRESS] prefix."""
+        if not self.LOGGING_ENABLED:
+            return
         self.operation_log.append({
             "type": op_type,
             "timestamp": time.time(),
@@ -85,20 +226,48 @@ class CompressionMemory(BaseMemoryStrategy):
             "timestamp": time.time()
         })
 
-    def get_importance_distribution(self) -> Dict[str, Any]:
-        """Return distribution of importance scores (buckets and average)."""
-        if not self.importance_distribution:
-            return {"avg_score": 0.0, "buckets": {}, "count": 0}
-        avg = sum(self.importance_distribution) / len(self.importance_distribution)
-        buckets = {"high": 0, "medium": 0, "low": 0}
-        for s in self.importance_distribution:
+    @property
+    def importance_distribution(self) -> np.ndarray:
+        """All importance scores recorded so far, in scoring order."""
+        return self._scores[:self._score_count]
+
+    def _record_scores(self, scores: List[float]) -> None:
+        """Append scores to the buffer and update the running sum and bucket counts."""
+        needed = self._score_count + len(scores)
+        if needed > len(self._scores):
+            self._scores = np.resize(self._scores, max(needed, 2 * len(self._scores)))
+        self._scores[self._score_count:needed] = scores
+        self._score_count = needed
+        for s in scores:
+            self._score_sum += s
             if s >= self.importance_threshold:
-                buckets["high"] += 1
+                self._score_buckets["high"] += 1
             elif s >= 0.4:
-                buckets["medium"] += 1
+                self._score_buckets["medium"] += 1
             else:
-                buckets["low"] += 1
-        return {"avg_score": round(avg, 4), "buckets": buckets, "count": len(self.importance_distribution)}
+                self._score_buckets["low"] += 1
+
+    def get_importance_distribution(self) -> Dict[str, Any]:
+        """Return distribution of importance scores (buckets and average)."""
+        if not self._score_count:
+            return {"avg_score": 0.0, "buckets": {}, "count": 0}
+        avg = self._score_sum / self._score_count
+        return {"avg_score": round(avg, 4), "buckets": dict(self._score_buckets), "count": self._score_count}
+
+    def _archive_entry(self, entry: Dict[str, Any]) -> None:
+        """Append an entry to the compressed archive and index its words."""
+        entry["_lower_tokens"] = frozenset(entry["content"].lower().split())
+        self.compressed_archive.append(entry)
+        self._archive_tokens += entry["token_count"]
+        self._index_archive_entry(len(self.compressed_archive) - 1, entry)
+
+    def _index_archive_entry(self, position: int, entry: Dict[str, Any]) -> None:
+        """Add an archive entry's words to the inverted index."""
+        for word in entry["_lower_tokens"]:
+            postings = self._archive_index.get(word)
+            if postings is None:
+                postings = self._archive_index[word] = array("i")
+            postings.append(position)
 
     def estimate_space_savings(self) -> float:
         """Calculate space savings as percentage (0-100)."""
@@ -108,7 +277,7 @@ class CompressionMemory(BaseMemoryStrategy):
             return 0.0
         return round((1.0 - comp / orig) * 100.0, 2)
 
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
         Add new conversation turn with importance scoring and compression triggers.
 
@@ -116,59 +285,172 @@ class CompressionMemory(BaseMemoryStrategy):
             user_input: User's message
             ai_response: AI's response
         """
-        importance_score = self._calculate_importance_score(user_input, ai_response)
-        self.importance_distribution.append(importance_score)
+        # Scoring is deferred to the compression cycle, which scores the whole pool at once
         segment = {
             "user_input": user_input,
             "ai_response": ai_response,
-            "importance_score": importance_score,
+            "importance_score": None,
+            "_formatted": f"User: {user_input}\nAI: {ai_response}",
             "timestamp": len(self.segment_pool),
             "token_count": count_tokens(user_input + ai_response),
             "compressed": False
         }
         self.segment_pool.append(segment)
+        self._recent_segments.append(segment)
+        self._pool_tokens += segment["token_count"]
         self.compression_stats["original_tokens"] += segment["token_count"]
-        self._log_operation("ADD_SEGMENT", {"importance": importance_score, "pool_size": len(self.segment_pool)})
+        self._log_operation("ADD_SEGMENT", {"pool_size": len(self.segment_pool), "pool_tokens": self._pool_tokens})
+
+        if self._pool_tokens >= self.mtm_budget:
+            await self._compress_memory_segments()
+            if self._archive_tokens > self.ltm_budget:
+                await self._consolidate_archive()
 
-        if len(self.segment_pool) >= 6:
-            self._compress_memory_segments()
+    @staticmethod
+    def _is_trivial_turn(user_input: str, ai_response: str) -> bool:
+        """Whether a turn is too short or too generic to be worth scoring with the LLM."""
+        if len(user_input) + len(ai_response) < TRIVIAL_TURN_CHARS:
+            return True
+        return bool(
+            _TRIVIAL_UTTERANCE.fullmatch(user_input.strip())
+            and _TRIVIAL_UTTERANCE.fullmatch(ai_response.strip())
+        )
 
-    def _calculate_importance_score(self, user_input: str, ai_response: str) -> float:
+    async def _calculate_importance_score(self, user_input: str, ai_response: str) -> float:
         """Calculate importance score for a conversation turn using LLM."""
+        if self._is_trivial_turn(user_input, ai_response):
+            self.scoring_counts["short_circuited"] += 1
+            return TRIVIAL_TURN_SCORE
+        embedding = await generate_embedding(f"User: {user_input}\nAI: {ai_response}", self.client)
+        cached = self._score_cache.get(embedding)
+        if cached is not None:
+            return cached
         scoring_prompt = (
-            f"Rate the importance of this conversation turn on a scale of 0.0 to 1.0. "
-            f"Consider factors like: factual information, user preferences, decisions, "
-            f"emotional significance, and future relevance. "
-            f"Respond with only a number between 0.0 and 1.0.\n\n"
             f"User: {user_input}\n"
             f"AI: {ai_response}"
         )
         try:
-            score_text = generate_text("You are an importance scoring expert.", scoring_prompt, self.client)
-            score = float(score_text.strip())
-            return max(0.0, min(1.0, score))
+            score_text = await generate_text(
+                "You are an importance scoring expert.", scoring_prompt, self.client,
+                static_prefix=_SCORING_INSTRUCTIONS
+            )
         except Exception:
-            return 0.5
+            score_text = ""
+        match = None if score_text.startswith("Error generating text") else _SCORE.search(score_text)
+        if match is None:
+            self.scoring_counts["fallback"] += 1
+            return FALLBACK_SCORE
+        score = max(0.0, min(1.0, float(match.group(1))))
+        self.scoring_counts["parsed"] += 1
+        self._score_cache.put(embedding, score)
+        return score
 
-    def _compress_memory_segments(self) -> None:
+    async def _score_segments(self, segments: List[Dict[str, Any]]) -> None:
+        """
+        Fill in importance scores for unscored segments.
+
+        Cached scores are reused; the remaining segments are rated with a single
+        batched LLM call, falling back to per-turn scoring if the reply can't be parsed.
+        """
+        pending = [s for s in segments if s["importance_score"] is None]
+        if not pending:
+            return
+        to_score = []
+        for segment in pending:
+            if self._is_trivial_turn(segment["user_input"], segment["ai_response"]):
+                segment["importance_score"] = TRIVIAL_TURN_SCORE
+                self.scoring_counts["short_circuited"] += 1
+            else:
+                to_score.append(segment)
+        embeddings = await generate_embedding(
+            [s["_formatted"] for s in to_score], self.client
+        ) if to_score else []
+        misses = []
+        for segment, embedding in zip(to_score, embeddings):
+            cached = self._score_cache.get(embedding)
+            if cached is None:
+                misses.append((segment, embedding))
+            else:
+                segment["importance_score"] = cached
+
+        if misses:
+            try:
+                scores = await self._batch_importance_scores([segment for segment, _ in misses])
+            except RuntimeError as e:
+                # The provider is failing: use the uncached fallback rather than sending
+                # one more call per turn into the same outage
+                for segment, _ in misses:
+                    segment["importance_score"] = FALLBACK_SCORE
+                self.scoring_counts["fallback"] += len(misses)
+                self._log_operation("SCORING_FAILED", {"segments": len(misses), "error": str(e)[:80]})
+            else:
+                if scores is not None:
+                    for (segment, embedding), score in zip(misses, scores):
+                        segment["importance_score"] = score
+                        self._score_cache.put(embedding, score)
+                    self.scoring_counts["parsed"] += len(misses)
+                else:
+                    # Per-turn fallback calls are independent, so issue them concurrently
+                    scores = await asyncio.gather(*(
+                        self._calculate_importance_score(segment["user_input"], segment["ai_response"])
+                        for segment, _ in misses
+                    ))
+                    for (segment, _), score in zip(misses, scores):
+                        segment["importance_score"] = score
+
+        self._record_scores([s["importance_score"] for s in pending])
+        self._log_operation("SCORE_SEGMENTS", {"scored": len(pending), "llm_scored": len(misses)})
+
+    async def _batch_importance_scores(self, segments: List[Dict[str, Any]]) -> Optional[List[float]]:
+        """
+        Rate several conversation turns with one LLM call; None if the reply can't be parsed.
+
+        Raises:
+            RuntimeError: If the provider call failed
+        """
+        turns = "\n".join(
+            f"{i}) User: {s['user_input']}\n   AI: {s['ai_response']}"
+            for i, s in enumerate(segments, 1)
+        )
+        scoring_prompt = f"There are {len(segments)} turns.\n\n{turns}"
+        try:
+            score_text = await generate_text(
+                "You are an importance scoring expert.", scoring_prompt, self.client,
+                static_prefix=_BATCH_SCORING_INSTRUCTIONS
+            )
+        except Exception as e:
+            raise RuntimeError(f"Error generating text: {e}") from e
+        if score_text.startswith("Error generating text"):
+            raise RuntimeError(score_text)
+        scores = _BATCH_SCORE_LINE.findall(score_text)
+        if len(scores) != len(segments):
+            return None
+        return [max(0.0, min(1.0, float(score))) for score in scores]
+
+    async def _compress_memory_segments(self) -> None:
         """Compress memory segments using intelligent algorithms."""
-        high_importance = [s for s in self.segment_pool if s["importance_score"] >= self.importance_threshold]
-        low_importance = [s for s in self.segment_pool if s["importance_score"] < self.importance_threshold]
-        original_tokens = sum(s["token_count"] for s in self.segment_pool)
+        await self._score_segments(self.segment_pool)
+        high_importance, low_importance, original_tokens = [], [], 0
+        threshold = self.importance_threshold
+        for s in self.segment_pool:
+            original_tokens += s["token_count"]
+            (high_importance if s["importance_score"] >= threshold else low_importance).append(s)
         compressed_tokens_this_cycle = 0
 
         if low_importance:
-            compressed_segment = self._semantic_compression(low_importance)
-            self.compressed_archive.append(compressed_segment)
-            compressed_tokens_this_cycle += count_tokens(compressed_segment.get("content", ""))
+            compressed_segment = await self._semantic_compression(low_importance)
+            self._archive_entry(compressed_segment)
+            compressed_tokens_this_cycle += compressed_segment["token_count"]
 
         for segment in high_importance:
             segment["compressed"] = True
-            content = f"User: {segment['user_input']}\nAI: {segment['ai_response']}"
-            compressed_tokens_this_cycle += count_tokens(content)
-            self.compressed_archive.append({
+            content = segment["_formatted"]
+            content_tokens = count_tokens(content)
+            compressed_tokens_this_cycle += content_tokens
+            self._archive_entry({
                 "type": "high_importance",
                 "content": content,
+                "token_count": content_tokens,
                 "importance_score": segment["importance_score"],
                 "timestamp": segment["timestamp"]
             })
@@ -177,61 +459,144 @@ class CompressionMemory(BaseMemoryStrategy):
         self.compression_stats["compression_count"] += 1
         self._track_compression_event(len(self.segment_pool), original_tokens, compressed_tokens_this_cycle)
         self.segment_pool = []
+        self._pool_tokens = 0
+        self._recent_segments.clear()
         self._log_operation("COMPRESSION_CYCLE", {"segments_processed": len(high_importance) + len(low_importance)})
-        print("[COMPRESS] Memory compression cycle completed.")
+        logger.debug("[COMPRESS] Memory compression cycle completed.")
 
-    def _semantic_compression(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _consolidate_archive(self) -> None:
+        """
+        Re-summarize the oldest half of the compressed archive into a single entry.
+
+        This is the long-term tier: archived summaries and high-importance turns
+        are merged once the archive outgrows ltm_budget.
+        """
+        half = len(self.compressed_archive) // 2
+        if half < 2:
+            return
+        oldest = self.compressed_archive[:half]
+        combined_text = "\n---\n".join(entry["content"] for entry in oldest)
+        consolidated_content = await generate_text(
+            "You are a memory compression expert.",
+            f"Memories:\n{combined_text}\n\nConsolidated Summary:",
+            self.client,
+            static_prefix=_CONSOLIDATION_INSTRUCTIONS
+        )
+        if consolidated_content.startswith("Error generating text"):
+            # Keep the archive as is; the next over-budget cycle retries
+            self._log_operation("CONSOLIDATE_FAILED", {"entries": half})
+            return
+        consolidated_tokens = count_tokens(consolidated_content)
+        removed_tokens = sum(entry["token_count"] for entry in oldest)
+        ranges = [entry.get("timestamp_range") or (entry["timestamp"], entry["timestamp"]) for entry in oldest]
+        consolidated = {
+            "type": "consolidated",
+            "content": consolidated_content,
+            "_lower_tokens": frozenset(consolidated_content.lower().split()),
+            "token_count": consolidated_tokens,
+            "original_segments": sum(entry.get("original_segments", 1) for entry in oldest),
+            "consolidated_entries": half,
+            "timestamp_range": (min(start for start, _ in ranges), max(end for _, end in ranges))
+        }
+
+        self.compressed_archive = [consolidated] + self.compressed_archive[half:]
+        self._archive_tokens += consolidated_tokens - removed_tokens
+        self.compression_stats["compressed_tokens"] += consolidated_tokens - removed_tokens
+        self._archive_index = {}
+        for position, entry in enumerate(self.compressed_archive):
+            self._index_archive_entry(position, entry)
+        self._log_operation("CONSOLIDATE_ARCHIVE", {
+            "entries_merged": half,
+            "tokens_before": removed_tokens,
+            "tokens_after": consolidated_tokens
+        })
+
+    async def _semantic_compression(self, segments: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Perform semantic-level compression on low importance segments."""
-        combined_text = "\n".join([
-            f"User: {s['user_input']}\nAI: {s['ai_response']}"
-            for s in segments
-        ])
-        compression_prompt = (
+        combined_text = "\n".join(s["_formatted"] for s in segments)
+        compression_instructions = (
             f"Compress the following conversations into a concise summary that retains "
             f"the key information while reducing length by approximately {int(self.compression_ratio * 100)}%. "
             f"Focus on facts, decisions, and context that might be relevant later.\n\n"
+        )
+        compression_prompt = (
             f"Conversations:\n{combined_text}\n\n"
             f"Compressed Summary:"
         )
-        compressed_content = generate_text("You are a memory compression expert.", compression_prompt, self.client)
+        cache_key = hashlib.blake2b(combined_text.encode(), digest_size=16).digest()
+        compressed_content = self._summary_cache.get(cache_key)
+        if compressed_content is not None:
+            self._summary_cache.move_to_end(cache_key)
+        else:
+            compressed_content = await generate_text(
+                "You are a memory compression expert.", compression_prompt, self.client,
+                static_prefix=compression_instructions
+            )
+            if compressed_content.startswith("Error generating text"):
+                # Archive the turns uncompressed rather than losing them to the error text
+                compressed_content = combined_text
+            else:
+                self._summary_cache[cache_key] = compressed_content
+                if len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+                    self._summary_cache.popitem(last=False)
         compressed_tokens = count_tokens(compressed_content)
         original_tokens = sum(s["token_count"] for s in segments)
         return {
             "type": "compressed",
             "content": compressed_content,
+            "token_count": compressed_tokens,
             "original_segments": len(segments),
             "compression_ratio": compressed_tokens / original_tokens if original_tokens > 0 else 0,
             "timestamp_range": (segments[0]["timestamp"], segments[-1]["timestamp"])
         }
 
-    def get_context(self, query: str) -> str:
+    async def get_context(self, query: str) -> str:
         """Retrieve relevant context from both active segments and compressed memory."""
         context_parts = []
-        for compressed_segment in self.compressed_archive:
-            if self._is_relevant_to_query(compressed_segment["content"], query):
-                context_parts.append(f"[Compressed Memory]: {compressed_segment['content']}")
-        for segment in self.segment_pool[-3:]:
-            context_parts.append(f"User: {segment['user_input']}\nAI: {segment['ai_response']}")
+        for position in self._relevant_archive_positions(query):
+            context_parts.append(f"[Compressed Memory]: {self.compressed_archive[position]['content']}")
+        for segment in self._recent_segments:
+            context_parts.append(segment["_formatted"])
         if not context_parts:
             return "No relevant information in memory yet."
         return "### Memory Context:\n" + "\n---\n".join(context_parts)
 
-    def _is_relevant_to_query(self, content: str, query: str) -> bool:
-        """Simple relevance check based on keyword overlap."""
-        query_words = set(query.lower().split())
-        content_words = set(content.lower().split())
-        overlap = len(query_words.intersection(content_words))
-        return overlap >= 2
+    def _relevant_archive_positions(self, query: str, min_overlap: int = 2) -> np.ndarray:
+        """
+        Find archived entries sharing at least min_overlap distinct words with the query.
+
+        Overlap counts for the whole archive come from one bincount over the
+        query words' posting lists, instead of intersecting word sets per entry.
+
+        Returns:
+            Archive positions in archive order
+        """
+        postings = [self._archive_index[word] for word in set(query.lower().split()) if word in self._archive_index]
+        if not postings:
+            return np.empty(0, dtype=np.intp)
+        positions = np.concatenate([np.frombuffer(p, dtype=np.intc) for p in postings])
+        overlap = np.bincount(positions, minlength=len(self.compressed_archive))
+        return np.flatnonzero(overlap >= min_overlap)
 
     def clear(self) -> None:
         """Reset all memory storage and statistics."""
         self.segment_pool = []
+        self._pool_tokens = 0
+        self._recent_segments.clear()
         self.compressed_archive = []
-        self.importance_distribution = []
+        self._archive_tokens = 0
+        self._archive_index = {}
+        self._scores = np.empty(1024, dtype=np.float32)
+        self._score_count = 0
+        self._score_sum = 0.0
+        self._score_buckets = {"high": 0, "medium": 0, "low": 0}
         self.compression_events = []
         self.compression_stats = {"original_tokens": 0, "compressed_tokens": 0, "compression_count": 0}
-        self.operation_log = []
-        print("[COMPRESS] Compression memory cleared.")
+        self.operation_log.clear()
+        self._score_cache.clear()
+        self._summary_cache.clear()
+        self.scoring_counts = {"short_circuited": 0, "parsed": 0, "fallback": 0}
+        logger.debug("[COMPRESS] Compression memory cleared.")
 
     def get_operation_log(self) -> List[Dict[str, Any]]:
         """Return strategy-specific operation log."""
@@ -259,7 +624,8 @@ class CompressionMemory(BaseMemoryStrategy):
             },
             "importance_analysis": {
                 "avg_score": dist["avg_score"],
-                "distribution": dist["buckets"]
+                "distribution": dist["buckets"],
+                "scoring": dict(self.scoring_counts)
             },
             "memory_size": f"{active_segments} active + {compressed_segments} compressed",
             "advantages": ["Space reduction", "Intelligent merging", "Redundancy filtering"],
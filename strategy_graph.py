@@ -6,13 +6,57 @@ enabling complex reasoning and relationship understanding. Particularly suited f
 expert systems and knowledge base applications.
 """
 
+import re
 import time
+import hashlib
+import logging
+from collections import OrderedDict
+from itertools import islice
+import numpy as np
 import networkx as nx
 from typing import List, Dict, Any, Optional, Set
-from openai import OpenAI
+from openai import AsyncOpenAI
 from memory_strategy_base import BaseMemoryStrategy
 from memory_utils import generate_text, get_openai_client
 
+logger = logging.getLogger(__name__)
+
+# Fixed extraction instructions, sent ahead of the text so providers can cache them
+_TURN_EXTRACTION_INSTRUCTIONS = (
+    "Extract key entities (people, places, concepts, facts) and relationships from each "
+    "of the two texts below. Format the answer exactly as:\n"
+    "USER_ENTITIES: entity1, entity2... USER_RELATIONSHIPS: entity1->relationship->entity2, etc.\n"
+    "ASSISTANT_ENTITIES: entity1, entity2... ASSISTANT_RELATIONSHIPS: entity1->relationship->entity2, etc.\n"
+    "Use 'none' for any empty list.\n\n"
+)
+_TEXT_EXTRACTION_INSTRUCTIONS = (
+    "Extract key entities (people, places, concepts, facts) and relationships from this text. "
+    "Format as: ENTITIES: entity1, entity2, entity3... RELATIONSHIPS: entity1->relationship->entity2, etc.\n"
+    "If no clear entities or relationships, respond with 'ENTITIES: none RELATIONSHIPS: none'\n\n"
+)
+_QUERY_EXTRACTION_INSTRUCTIONS = (
+    "Extract ONLY the key named entities (specific people, places, organizations) from this query. "
+    "Focus on proper nouns and specific subjects that would be nodes in a knowledge graph. "
+    "Do NOT extract general words like 'everyone', 'team', 'reports', 'list'. "
+    "Examples:\n"
+    "- From 'Who does Bob report to?' extract: Bob\n"
+    "- From 'List everyone who reports to Alice' extract: Alice\n"
+    "- From 'What is the project status?' extract: project\n"
+    "List entities separated by commas. If no clear named entities, respond with 'none'.\n\n"
+)
+
+# Speaker-labelled sections of a combined turn extraction response
+_TURN_SECTION = re.compile(
+    r"(USER|ASSISTANT)_ENTITIES:\s*(.*?)\s*\1_RELATIONSHIPS:\s*(.*?)(?=\s*(?:USER|ASSISTANT)_ENTITIES:|\Z)",
+    re.S
+)
+
+# "ENTITIES: ... RELATIONSHIPS: ..." extraction response
+_EXTRACTION = re.compile(r"ENTITIES:\s*(?P<entities>.*?)\s*RELATIONSHIPS:\s*(?P<relationships>.*)", re.S)
+
+# One comma-separated "source->relationship->target" triple
+_RELATIONSHIP = re.compile(r"(?:^|,)\s*([^,>]+?)\s*->\s*([^,>]+?)\s*->\s*([^,>]+?)\s*(?=,|$)")
+
 
 class GraphMemory(BaseMemoryStrategy):
     """
@@ -39,23 +83,35 @@ class GraphMemory(BaseMemoryStrategy):
     UI_COLOR = "#6366F1"
     UI_ICON = "graph"
 
-    def __init__(self, client: Optional[OpenAI] = None):
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
         """
         Initialize graph memory system.
 
         Args:
-            client: Optional OpenAI client instance
+            client: Optional AsyncOpenAI client instance
         """
         self.client = client or get_openai_client()
         self.knowledge_graph = nx.DiGraph()
+        # Lowercased node name -> nodes with that name, for case-insensitive entity lookup
+        self._lc_nodes: Dict[str, List[str]] = {}
+        # Read-only CSR/CSC mirror of the graph for traversal, rebuilt after writes
+        self._adjacency: Dict[str, Any] = {}
+        self._adjacency_dirty = True
+        # LRU of extraction responses keyed by normalized text digest
+        self._extraction_cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self.extraction_cache_size = 2048
         self.node_counter = 0
         self.conversation_history: List[Dict[str, str]] = []
         self.entity_extraction_log: List[Dict[str, Any]] = []
-        self.graph_metrics_cache: Dict[str, Any] = {}
+        # Union-find over nodes, so weakly connected components are counted incrementally
+        self._component_parent: Dict[str, str] = {}
+        self._component_count = 0
         self.operation_log: List[Dict[str, Any]] = []
 
     def _log_operation(self, op_type: str, details: Dict[str, Any]) -> None:
         """Log operation with [GRAPH] prefix."""
+        if not self.LOGGING_ENABLED:
+            return
         self.operation_log.append({
             "type": op_type,
             "timestamp": time.time(),
@@ -72,29 +128,87 @@ class GraphMemory(BaseMemoryStrategy):
             "speaker": speaker,
             "timestamp": time.time()
         })
-        self.graph_metrics_cache = {}
 
     def get_graph_topology(self) -> Dict[str, Any]:
         """Return graph structure metrics (nodes, edges, density, avg degree, connected components)."""
-        if self.graph_metrics_cache:
-            return self.graph_metrics_cache
         num_nodes = self.knowledge_graph.number_of_nodes()
         num_edges = self.knowledge_graph.number_of_edges()
-        density = nx.density(self.knowledge_graph) if num_nodes > 1 else 0.0
-        degrees = [d for _, d in self.knowledge_graph.degree()]
-        avg_degree = sum(degrees) / len(degrees) if degrees else 0.0
-        try:
-            comps = nx.number_weakly_connected_components(self.knowledge_graph)
-        except Exception:
-            comps = 1
-        self.graph_metrics_cache = {
+        density = num_edges / (num_nodes * (num_nodes - 1)) if num_nodes > 1 else 0.0
+        # Each directed edge adds one to the total in+out degree at both ends
+        avg_degree = 2 * num_edges / num_nodes if num_nodes else 0.0
+        return {
             "nodes": num_nodes,
             "edges": num_edges,
             "density": round(density, 4),
             "avg_degree": round(avg_degree, 4),
-            "connected_components": comps
+            "connected_components": self._component_count
+        }
+
+    def _find_component(self, node: str) -> str:
+        """Return the union-find root of a node, compressing the path on the way."""
+        parent = self._component_parent
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+        return root
+
+    def _union_components(self, source: str, target: str) -> None:
+        """Merge the components joined by an edge."""
+        source_root = self._find_component(source)
+        target_root = self._find_component(target)
+        if source_root != target_root:
+            self._component_parent[target_root] = source_root
+            self._component_count -= 1
+
+    def _index_node(self, node: str) -> None:
+        """Register a graph node under its lowercased name and as its own component."""
+        variants = self._lc_nodes.setdefault(node.lower(), [])
+        if node not in variants:
+            variants.append(node)
+        if node not in self._component_parent:
+            self._component_parent[node] = node
+            self._component_count += 1
+
+    def _match_nodes(self, entity: str) -> List[str]:
+        """
+        Find graph nodes matching a query entity, ignoring case.
+
+        Every node whose name contains, or is contained in, the entity is
+        returned. Exact name matches (in any case) come straight from the
+        index and are listed first; the containment scan covers the rest.
+        """
+        entity_lc = entity.lower()
+        matches = list(self._lc_nodes.get(entity_lc, ()))
+        for node_lc, nodes in self._lc_nodes.items():
+            if node_lc != entity_lc and (entity_lc in node_lc or node_lc in entity_lc):
+                matches.extend(nodes)
+        return matches
+
+    def _rebuild_adjacency(self) -> None:
+        """Mirror the graph into CSR (outgoing) and CSC (incoming) arrays."""
+        graph = self.knowledge_graph
+        names = list(graph.nodes())
+        node_ids = {node: i for i, node in enumerate(names)}
+
+        def compress(adjacency):
+            indptr, indices, relationships = [0], [], []
+            for node in names:
+                for other, data in adjacency[node].items():
+                    indices.append(node_ids[other])
+                    relationships.append(data.get('relationship', 'related to'))
+                indptr.append(len(indices))
+            return np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64), relationships
+
+        self._adjacency = {
+            "names": names,
+            "node_ids": node_ids,
+            "speakers": [graph.nodes[node].get('speaker', 'unknown') for node in names],
+            "out": compress(graph.succ),
+            "in": compress(graph.pred)
         }
-        return self.graph_metrics_cache
+        self._adjacency_dirty = False
 
     def visualize_graph(self) -> Dict[str, Any]:
         """Return graph data for UI visualization (nodes and edges lists)."""
@@ -106,7 +220,7 @@ class GraphMemory(BaseMemoryStrategy):
         ]
         return {"topology": topo, "nodes": nodes, "edges": edges}
 
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
         Add conversation turn to graph by extracting entities and relationships.
 
@@ -119,74 +233,116 @@ class GraphMemory(BaseMemoryStrategy):
             "assistant": ai_response,
             "turn_id": self.node_counter
         })
-        self._extract_and_add_entities(user_input, "user", self.node_counter)
-        self._extract_and_add_entities(ai_response, "assistant", self.node_counter)
+        await self._extract_turn(user_input, ai_response, self.node_counter)
         self.node_counter += 1
         self._log_operation("ADD_TURN", {"turn_id": self.node_counter - 1})
 
-    def _extract_and_add_entities(self, text: str, speaker: str, turn_id: int) -> None:
-        """Extract entities and relationships from text and add to knowledge graph."""
-        print(f"[GRAPH EXTRACTION] Processing text: {text[:100]}...")
-        extraction_prompt = (
-            f"Extract key entities (people, places, concepts, facts) and relationships from this text. "
-            f"Format as: ENTITIES: entity1, entity2, entity3... RELATIONSHIPS: entity1->relationship->entity2, etc.\n\n"
-            f"Text: {text}\n\n"
-            f"If no clear entities or relationships, respond with 'ENTITIES: none RELATIONSHIPS: none'"
-        )
-        extracted_info = generate_text(
+    async def _generate_extraction(self, cache_text: str, instructions: str, extraction_prompt: str) -> str:
+        """Run an extraction prompt, reusing the response for previously seen text."""
+        key = hashlib.blake2b(cache_text.strip().lower().encode(), digest_size=16).digest()
+        extracted_info = self._extraction_cache.get(key)
+        if extracted_info is not None:
+            self._extraction_cache.move_to_end(key)
+            logger.debug("[GRAPH EXTRACTION] Cache hit")
+            return extracted_info
+        extracted_info = await generate_text(
             "You are an entity and relationship extraction expert.",
             extraction_prompt,
-            self.client
+            self.client,
+            static_prefix=instructions
+        )
+        if not extracted_info.startswith("Error generating text"):
+            self._extraction_cache[key] = extracted_info
+            if len(self._extraction_cache) > self.extraction_cache_size:
+                self._extraction_cache.popitem(last=False)
+        return extracted_info
+
+    async def _extract_turn(self, user_input: str, ai_response: str, turn_id: int) -> None:
+        """
+        Extract entities and relationships from both sides of a turn with one LLM call.
+
+        Falls back to per-utterance extraction if the response is missing a speaker section.
+        """
+        logger.debug("[GRAPH EXTRACTION] Processing turn %d", turn_id)
+        extraction_prompt = (
+            f"User text: {user_input}\n\n"
+            f"Assistant text: {ai_response}"
         )
-        print(f"[GRAPH EXTRACTION] LLM extracted: {extracted_info}")
+        extracted_info = await self._generate_extraction(
+            f"{user_input}\x00{ai_response}", _TURN_EXTRACTION_INSTRUCTIONS, extraction_prompt
+        )
+        logger.debug("[GRAPH EXTRACTION] LLM extracted: %s", extracted_info)
+        sections = {speaker: (entities, relationships) for speaker, entities, relationships in _TURN_SECTION.findall(extracted_info)}
+        if "USER" not in sections or "ASSISTANT" not in sections:
+            await self._extract_and_add_entities(user_input, "user", turn_id)
+            await self._extract_and_add_entities(ai_response, "assistant", turn_id)
+            return
+
+        for speaker, text in (("user", user_input), ("assistant", ai_response)):
+            entities, relationships = sections[speaker.upper()]
+            entities_added, relationships_added = self._add_extraction(entities, relationships, speaker, turn_id, text)
+            logger.debug("[GRAPH EXTRACTION] Added %d %s entities: %s", len(entities_added), speaker, entities_added)
+            logger.debug("[GRAPH EXTRACTION] Added %d %s relationships: %s", len(relationships_added), speaker, relationships_added)
+            self._track_entity_extraction(entities_added, relationships_added, speaker)
+
+    async def _extract_and_add_entities(self, text: str, speaker: str, turn_id: int) -> None:
+        """Extract entities and relationships from text and add to knowledge graph."""
+        logger.debug("[GRAPH EXTRACTION] Processing text: %.100s...", text)
+        extraction_prompt = f"Text: {text}"
+        extracted_info = await self._generate_extraction(text, _TEXT_EXTRACTION_INSTRUCTIONS, extraction_prompt)
+        logger.debug("[GRAPH EXTRACTION] LLM extracted: %s", extracted_info)
         entities_added, relationships_added = self._parse_and_add_to_graph(extracted_info, speaker, turn_id, text)
-        print(f"[GRAPH EXTRACTION] Added {len(entities_added)} entities: {entities_added}")
-        print(f"[GRAPH EXTRACTION] Added {len(relationships_added)} relationships: {relationships_added}")
+        logger.debug("[GRAPH EXTRACTION] Added %d entities: %s", len(entities_added), entities_added)
+        logger.debug("[GRAPH EXTRACTION] Added %d relationships: %s", len(relationships_added), relationships_added)
         self._track_entity_extraction(entities_added, relationships_added, speaker)
 
     def _parse_and_add_to_graph(self, extracted_info: str, speaker: str, turn_id: int, original_text: str) -> tuple:
         """Parse extracted entities and relationships and add them to the knowledge graph. Returns (entities_list, relationships_list)."""
+        match = _EXTRACTION.search(extracted_info)
+        if match is None:
+            return ([], [])
+        return self._add_extraction(match["entities"], match["relationships"], speaker, turn_id, original_text)
+
+    def _add_extraction(self, entities_part: str, relationships_part: str, speaker: str, turn_id: int, original_text: str) -> tuple:
+        """Add parsed entity and relationship lists to the knowledge graph. Returns (entities_list, relationships_list)."""
         entities_added: List[str] = []
         relationships_added: List[str] = []
+        entities_part = entities_part.strip()
+        relationships_part = relationships_part.strip()
         try:
-            if "ENTITIES:" in extracted_info and "RELATIONSHIPS:" in extracted_info:
-                parts = extracted_info.split("RELATIONSHIPS:")
-                entities_part = parts[0].replace("ENTITIES:", "").strip()
-                relationships_part = parts[1].strip() if len(parts) > 1 else ""
-
-                if entities_part.lower() != "none":
-                    entities = [e.strip() for e in entities_part.split(",") if e.strip()]
-                    for entity in entities:
-                        if entity:
-                            self.knowledge_graph.add_node(
-                                entity,
-                                type="entity",
-                                speaker=speaker,
-                                turn_id=turn_id,
-                                context=original_text[:100]
-                            )
-                            entities_added.append(entity)
-
-                if relationships_part.lower() != "none":
-                    relationships = [r.strip() for r in relationships_part.split(",") if r.strip()]
-                    for rel in relationships:
-                        if "->" in rel:
-                            rel_parts = rel.split("->")
-                            if len(rel_parts) == 3:
-                                source, relation, target = [p.strip() for p in rel_parts]
-                                if source and target and relation:
-                                    self.knowledge_graph.add_edge(
-                                        source, target,
-                                        relationship=relation,
-                                        turn_id=turn_id,
-                                        speaker=speaker
-                                    )
-                                    relationships_added.append(rel)
+            if entities_part.lower() != "none":
+                for entity in entities_part.split(","):
+                    entity = entity.strip()
+                    if entity:
+                        self.knowledge_graph.add_node(
+                            entity,
+                            type="entity",
+                            speaker=speaker,
+                            turn_id=turn_id,
+                            context=original_text[:100]
+                        )
+                        self._index_node(entity)
+                        entities_added.append(entity)
+
+            if relationships_part.lower() != "none":
+                for source, relation, target in _RELATIONSHIP.findall(relationships_part):
+                    self.knowledge_graph.add_edge(
+                        source, target,
+                        relationship=relation,
+                        turn_id=turn_id,
+                        speaker=speaker
+                    )
+                    self._index_node(source)
+                    self._index_node(target)
+                    self._union_components(source, target)
+                    relationships_added.append(f"{source}->{relation}->{target}")
         except Exception as e:
-            print(f"[GRAPH] Error parsing extracted info: {e}")
+            logger.warning("[GRAPH] Error parsing extracted info: %s", e)
+        if entities_added or relationships_added:
+            self._adjacency_dirty = True
         return (entities_added, relationships_added)
 
-    def get_context(self, query: str) -> str:
+    async def get_context(self, query: str) -> str:
         """
         Retrieve relevant context by traversing the knowledge graph.
 
@@ -196,75 +352,83 @@ class GraphMemory(BaseMemoryStrategy):
         Returns:
             Relevant context from knowledge graph and conversation history
         """
-        print(f"[GRAPH GET_CONTEXT] Query: {query}")
-        print(f"[GRAPH GET_CONTEXT] Current graph has {self.knowledge_graph.number_of_nodes()} nodes, {self.knowledge_graph.number_of_edges()} edges")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("[GRAPH GET_CONTEXT] Query: %s", query)
+            logger.debug(
+                "[GRAPH GET_CONTEXT] Current graph has %d nodes, %d edges",
+                self.knowledge_graph.number_of_nodes(), self.knowledge_graph.number_of_edges()
+            )
         
         if self.knowledge_graph.number_of_nodes() == 0:
             return "No information in memory yet."
             
-        query_extraction_prompt = (
-            f"Extract ONLY the key named entities (specific people, places, organizations) from this query. "
-            f"Focus on proper nouns and specific subjects that would be nodes in a knowledge graph. "
-            f"Do NOT extract general words like 'everyone', 'team', 'reports', 'list'. "
-            f"Examples:\n"
-            f"- From 'Who does Bob report to?' extract: Bob\n"
-            f"- From 'List everyone who reports to Alice' extract: Alice\n"
-            f"- From 'What is the project status?' extract: project\n"
-            f"List entities separated by commas. If no clear named entities, respond with 'none'.\n\n"
-            f"Query: {query}"
-        )
-        query_entities = generate_text(
+        query_extraction_prompt = f"Query: {query}"
+        query_entities = await generate_text(
             "You are an entity extraction expert.",
             query_extraction_prompt,
-            self.client
+            self.client,
+            static_prefix=_QUERY_EXTRACTION_INSTRUCTIONS
         )
-        print(f"[GRAPH GET_CONTEXT] Extracted query entities: {query_entities}")
+        logger.debug("[GRAPH GET_CONTEXT] Extracted query entities: %s", query_entities)
         
         relevant_info = []
+        if self._adjacency_dirty:
+            self._rebuild_adjacency()
+        adjacency = self._adjacency
+        names = adjacency["names"]
+        out_indptr, out_indices, out_relationships = adjacency["out"]
+        in_indptr, in_indices, in_relationships = adjacency["in"]
         if query_entities.lower() != "none":
             entities = [e.strip() for e in query_entities.split(",") if e.strip()]
-            print(f"[GRAPH GET_CONTEXT] Looking for entities: {entities}")
-            print(f"[GRAPH GET_CONTEXT] Available nodes in graph: {list(self.knowledge_graph.nodes())[:20]}")  # Show first 20
+            if debug:
+                logger.debug("[GRAPH GET_CONTEXT] Looking for entities: %s", entities)
+                logger.debug(
+                    "[GRAPH GET_CONTEXT] Available nodes in graph: %s",
+                    list(islice(self.knowledge_graph.nodes(), 20))  # Show first 20
+                )
             
             for entity in entities:
-                for node in self.knowledge_graph.nodes():
-                    if entity.lower() in node.lower() or node.lower() in entity.lower():
-                        print(f"[GRAPH GET_CONTEXT] Found matching node: {node}")
-                        node_data = self.knowledge_graph.nodes[node]
-                        relevant_info.append(f"Entity: {node} (from {node_data.get('speaker', 'unknown')})")
-                        
-                        # Outgoing edges (node -> neighbor)
-                        for neighbor in self.knowledge_graph.neighbors(node):
-                            edge_data = self.knowledge_graph.edges[node, neighbor]
-                            relationship = edge_data.get('relationship', 'related to')
-                            relevant_info.append(f"  -> {relationship} -> {neighbor}")
+                for node in self._match_nodes(entity):
+                    logger.debug("[GRAPH GET_CONTEXT] Found matching node: %s", node)
+                    i = adjacency["node_ids"][node]
+                    relevant_info.append(f"Entity: {node} (from {adjacency['speakers'][i]})")
+                    
+                    # Outgoing edges (node -> neighbor)
+                    start, end = out_indptr[i], out_indptr[i + 1]
+                    for neighbor, relationship in zip(out_indices[start:end], out_relationships[start:end]):
+                        relevant_info.append(f"  -> {relationship} -> {names[neighbor]}")
+                    
+                    # Incoming edges (predecessor -> node)
+                    start, end = in_indptr[i], in_indptr[i + 1]
+                    for predecessor, relationship in zip(in_indices[start:end], in_relationships[start:end]):
+                        relevant_info.append(f"  <- {names[predecessor]} <- {relationship}")
                         
-                        # Incoming edges (predecessor -> node)
-                        for predecessor in self.knowledge_graph.predecessors(node):
-                            edge_data = self.knowledge_graph.edges[predecessor, node]
-                            relationship = edge_data.get('relationship', 'related to')
-                            relevant_info.append(f"  <- {predecessor} <- {relationship}")
-                            
         if not relevant_info:
-            print(f"[GRAPH GET_CONTEXT] No relevant entities found, using recent turns")
+            logger.debug("[GRAPH GET_CONTEXT] No relevant entities found, using recent turns")
             recent_turns = self.conversation_history[-3:]
             for turn in recent_turns:
                 relevant_info.append(f"Turn {turn['turn_id']}: User: {turn['user']}")
                 relevant_info.append(f"Turn {turn['turn_id']}: Assistant: {turn['assistant']}")
                 
         context = "### Knowledge Graph Context:\n" + "\n".join(relevant_info) if relevant_info else "No relevant information found."
-        print(f"[GRAPH GET_CONTEXT] Returning context with {len(relevant_info)} items")
+        logger.debug("[GRAPH GET_CONTEXT] Returning context with %d items", len(relevant_info))
         return context
 
     def clear(self) -> None:
         """Reset the knowledge graph and conversation history."""
         self.knowledge_graph.clear()
+        self._lc_nodes = {}
+        self._extraction_cache.clear()
+        self._adjacency = {}
+        self._adjacency_dirty = True
         self.conversation_history = []
         self.node_counter = 0
         self.entity_extraction_log = []
-        self.graph_metrics_cache = {}
+        self._component_parent = {}
+        self._component_count = 0
         self.operation_log = []
-        print("[GRAPH] Graph memory cleared.")
+        logger.debug("[GRAPH] Graph memory cleared.")
 
     def get_operation_log(self) -> List[Dict[str, Any]]:
         """Return strategy-specific operation log."""
@@ -5,9 +5,10 @@ This strategy combines multiple memory types into a layered system that mimics
 human memory patterns with working memory (short-term) and long-term memory layers.
 """
 
+import re
 import time
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from openai import AsyncOpenAI
 from memory_strategy_base import BaseMemoryStrategy
 from strategy_sliding_window import SlidingWindowMemory
 from strategy_retrieval import RetrievalMemory
@@ -44,7 +45,7 @@ class HierarchicalMemory(BaseMemoryStrategy):
         window_size: int = 2,
         k: int = 2,
         embedding_dim: int = 1536,
-        client: Optional[OpenAI] = None
+        client: Optional[AsyncOpenAI] = None
     ):
         """
         Initialize hierarchical memory system.
@@ -53,18 +54,25 @@ class HierarchicalMemory(BaseMemoryStrategy):
             window_size: Size of short-term working memory (in turns)
             k: Number of documents to retrieve from long-term memory
             embedding_dim: Embedding vector dimension for long-term memory
-            client: Optional OpenAI client instance
+            client: Optional AsyncOpenAI client instance
         """
         self.client = client or get_openai_client()
         self.working_memory = SlidingWindowMemory(window_size=window_size)
         self.long_term_memory = RetrievalMemory(k=k, embedding_dim=embedding_dim, client=self.client)
         self.promotion_keywords = ["remember", "rule", "preference", "always", "never", "allergic", "important"]
+        # All keywords compiled into one case-insensitive alternation, scanned in a single pass
+        self._promotion_matcher = re.compile(
+            "|".join(re.escape(keyword) for keyword in self.promotion_keywords), re.IGNORECASE
+        )
         self.promotion_events: List[Dict[str, Any]] = []
+        self._last_user_input = ""
         self.tier_access_counts = {"working": 0, "long_term": 0}
         self.operation_log: List[Dict[str, Any]] = []
 
     def _log_operation(self, op_type: str, details: Dict[str, Any]) -> None:
         """Log operation with [HIERARCHICAL] prefix."""
+        if not self.LOGGING_ENABLED:
+            return
         self.operation_log.append({
             "type": op_type,
             "timestamp": time.time(),
@@ -97,7 +105,7 @@ class HierarchicalMemory(BaseMemoryStrategy):
             "long_term_stats": long_term_stats
         }
 
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
         Add messages to working memory and conditionally promote to long-term memory.
 
@@ -105,18 +113,24 @@ class HierarchicalMemory(BaseMemoryStrategy):
             user_input: User's message
             ai_response: AI's response
         """
-        self.working_memory.add_message(user_input, ai_response)
-        if any(keyword in user_input.lower() for keyword in self.promotion_keywords):
-            self._track_promotion_event(user_input)
-            self.long_term_memory.add_message(user_input, ai_response)
-            self._log_operation("PROMOTION", {"preview": user_input[:50]})
+        await self.working_memory.add_message(user_input, ai_response)
+        self._last_user_input = user_input
+        promoted = self._promotion_matcher.search(user_input) is not None
+        if promoted:
+            preview = user_input[:80]
+            self._track_promotion_event(preview)
+            await self.long_term_memory.add_message(user_input, ai_response)
+            self._log_operation("PROMOTION", {"preview": preview[:50]})
             print("[HIERARCHICAL] Promoting message to long-term storage.")
-        self._log_operation("ADD_TURN", {"promoted": any(k in user_input.lower() for k in self.promotion_keywords)})
+        self._log_operation("ADD_TURN", {"promoted": promoted})
 
-    def get_context(self, query: str) -> str:
+    async def get_context(self, query: str) -> str:
         """
         Construct rich context by combining relevant information from both memory layers.
 
+        Long-term memory is searched for the query and the most recent user
+        message together, in one batched retrieval.
+
         Args:
             query: Current user query
 
@@ -124,13 +138,18 @@ class HierarchicalMemory(BaseMemoryStrategy):
             Combined context from long-term and short-term memory
         """
         self.tier_access_counts["working"] += 1
-        working_context = self.working_memory.get_context(query)
+        working_context = await self.working_memory.get_context(query)
         self.tier_access_counts["long_term"] += 1
-        long_term_context = self.long_term_memory.get_context(query)
-
-        if ("No information in memory yet" in long_term_context or
-                "Could not find any relevant information" in long_term_context):
+        queries = [query]
+        if self._last_user_input and self._last_user_input != query:
+            queries.append(self._last_user_input)
+        retrieved = await self.long_term_memory.retrieve(queries)
+        # Merge per-query results, keeping the query's own matches first
+        long_term_docs = list(dict.fromkeys(doc for docs in retrieved if docs for doc in docs))
+
+        if not long_term_docs:
             return f"### Recent Context:\n{working_context}"
+        long_term_context = "### Relevant Information Retrieved from Memory:\n" + "\n---\n".join(long_term_docs)
         return f"### Long-Term Context:\n{long_term_context}\n\n### Recent Context:\n{working_context}"
 
     def clear(self) -> None:
@@ -138,6 +157,7 @@ class HierarchicalMemory(BaseMemoryStrategy):
         self.working_memory.clear()
         self.long_term_memory.clear()
         self.promotion_events = []
+        self._last_user_input = ""
         self.tier_access_counts = {"working": 0, "long_term": 0}
         self.operation_log = []
         print("[HIERARCHICAL] Hierarchical memory cleared.")
@@ -7,10 +7,13 @@ a short-term sliding window of recent conversations and a separate list of
 """
 
 import time
+import numpy as np
+from array import array
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from openai import AsyncOpenAI
 from memory_strategy_base import BaseMemoryStrategy
 from strategy_sliding_window import SlidingWindowMemory
+from strategy_retrieval import RetrievalMemory
 from memory_utils import generate_text, get_openai_client
 
 
@@ -39,23 +42,36 @@ class MemoryAugmentedMemory(BaseMemoryStrategy):
     UI_COLOR = "#EC4899"
     UI_ICON = "brain"
 
-    def __init__(self, window_size: int = 2, client: Optional[OpenAI] = None):
+    def __init__(
+        self,
+        window_size: int = 2,
+        token_k: int = 5,
+        embedding_dim: int = 1536,
+        client: Optional[AsyncOpenAI] = None
+    ):
         """
         Initialize memory-augmented system.
 
         Args:
             window_size: Number of recent turns to retain in short-term memory
-            client: Optional OpenAI client instance
+            token_k: Number of memory tokens most relevant to the query to include in context
+            embedding_dim: Embedding vector dimension for the memory token index
+            client: Optional AsyncOpenAI client instance
         """
         self.client = client or get_openai_client()
         self.recent_memory = SlidingWindowMemory(window_size=window_size)
         self.memory_tokens: List[str] = []
+        self.token_k = token_k
+        self._token_index = RetrievalMemory(k=token_k, embedding_dim=embedding_dim, client=self.client)
         self.fact_extraction_log: List[Dict[str, Any]] = []
-        self.token_quality_scores: List[float] = []
+        # Packed float64 buffer so distribution stats are single NumPy reductions
+        self.token_quality_scores = array("d")
         self.operation_log: List[Dict[str, Any]] = []
 
     def _log_operation(self, op_type: str, details: Dict[str, Any]) -> None:
         """Log operation with [MEM_AUG] prefix."""
+        if not self.LOGGING_ENABLED:
+            return
         self.operation_log.append({
             "type": op_type,
             "timestamp": time.time(),
@@ -76,14 +92,15 @@ class MemoryAugmentedMemory(BaseMemoryStrategy):
         """Return distribution of token quality scores."""
         if not self.token_quality_scores:
             return {"avg": 0.0, "min": 0.0, "max": 0.0, "count": 0}
+        scores = np.frombuffer(self.token_quality_scores, dtype=np.float64)
         return {
-            "avg": round(sum(self.token_quality_scores) / len(self.token_quality_scores), 4),
-            "min": round(min(self.token_quality_scores), 4),
-            "max": round(max(self.token_quality_scores), 4),
-            "count": len(self.token_quality_scores)
+            "avg": round(float(scores.mean()), 4),
+            "min": round(float(scores.min()), 4),
+            "max": round(float(scores.max()), 4),
+            "count": len(scores)
         }
 
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
         Add latest turn to recent memory, then use LLM call to decide
         if new persistent memory tokens should be created from this interaction.
@@ -92,14 +109,14 @@ class MemoryAugmentedMemory(BaseMemoryStrategy):
             user_input: User's message
             ai_response: AI's response
         """
-        self.recent_memory.add_message(user_input, ai_response)
+        await self.recent_memory.add_message(user_input, ai_response)
         fact_extraction_prompt = (
             f"Analyze the following conversation turn. Does it contain a core fact, preference, or decision that should be remembered long-term? "
             f"Examples include user preferences ('I hate flying'), key decisions ('The budget is $1000'), or important facts ('My user ID is 12345').\n\n"
             f"Conversation Turn:\nUser: {user_input}\nAI: {ai_response}\n\n"
             f"If it contains such a fact, state the fact concisely in one sentence. Otherwise, respond with 'No important fact.'"
         )
-        extracted_fact = generate_text(
+        extracted_fact = await generate_text(
             "You are a fact-extraction expert.",
             fact_extraction_prompt,
             self.client
@@ -108,14 +125,15 @@ class MemoryAugmentedMemory(BaseMemoryStrategy):
             quality = min(1.0, len(extracted_fact.strip()) / 100.0) if extracted_fact.strip() else 0.5
             self._track_fact_extraction(extracted_fact.strip(), quality)
             self.memory_tokens.append(extracted_fact.strip())
+            await self._token_index.add_documents([extracted_fact.strip()])
             self._log_operation("FACT_EXTRACTED", {"preview": extracted_fact[:50], "quality": quality})
             print("[MEM_AUG] New memory token created.")
         self._log_operation("ADD_TURN", {"tokens_count": len(self.memory_tokens)})
 
-    def get_context(self, query: str) -> str:
+    async def get_context(self, query: str) -> str:
         """
         Construct context by combining short-term recent conversation
-        with list of all long-term, persistent memory tokens.
+        with the long-term memory tokens most relevant to the query.
 
         Args:
             query: Current user query
@@ -123,9 +141,14 @@ class MemoryAugmentedMemory(BaseMemoryStrategy):
         Returns:
             Combined context from memory tokens and recent conversation
         """
-        recent_context = self.recent_memory.get_context(query)
+        recent_context = await self.recent_memory.get_context(query)
         if self.memory_tokens:
-            memory_token_context = "\n".join([f"- {token}" for token in self.memory_tokens])
+            tokens = self.memory_tokens
+            if len(tokens) > self.token_k:
+                # Only the top-k tokens by similarity; the latest ones if the query can't be embedded
+                relevant = (await self._token_index.retrieve([query]))[0]
+                tokens = relevant if relevant else tokens[-self.token_k:]
+            memory_token_context = "\n".join([f"- {token}" for token in tokens])
             return f"### Key Memory Tokens (Long-Term Facts):\n{memory_token_context}\n\n### Recent Conversation:\n{recent_context}"
         return f"### Recent Conversation:\n{recent_context}"
 
@@ -133,8 +156,9 @@ class MemoryAugmentedMemory(BaseMemoryStrategy):
         """Reset both recent memory and memory tokens."""
         self.recent_memory.clear()
         self.memory_tokens = []
+        self._token_index.clear()
         self.fact_extraction_log = []
-        self.token_quality_scores = []
+        self.token_quality_scores = array("d")
         self.operation_log = []
         print("[MEM_AUG] Memory-augmented memory cleared.")
 
@@ -154,7 +178,7 @@ class MemoryAugmentedMemory(BaseMemoryStrategy):
         quality_dist = self.get_token_quality_distribution()
         recent_window_size = recent_stats.get("window_metrics", {}).get("utilization", 0)
         if not isinstance(recent_window_size, int):
-            recent_window_size = len(getattr(self.recent_memory, "circular_buffer", []))
+            recent_window_size = len(getattr(self.recent_memory, "circular_buffer", [])) // 2
         return {
             "strategy_id": self.STRATEGY_ID,
             "strategy_type": "MemoryAugmentedMemory",
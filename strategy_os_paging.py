@@ -6,11 +6,20 @@ RAM (active memory) and disk (passive memory), implementing paging mechanisms
 for intelligent memory management.
 """
 
+import re
 import time
-from collections import deque
-from typing import Dict, Any, Optional, Tuple, List
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, FrozenSet, Optional, Tuple, List, Set
 from memory_strategy_base import BaseMemoryStrategy
 
+# Words longer than three characters are the paging keys for disk lookups
+_PAGE_WORD = re.compile(r"\w{4,}")
+
+
+def _page_words(text: str) -> FrozenSet[str]:
+    """Return the distinct lowercased paging keys in text."""
+    return frozenset(_PAGE_WORD.findall(text.lower()))
+
 
 class OSMemory(BaseMemoryStrategy):
     """
@@ -37,16 +46,23 @@ class OSMemory(BaseMemoryStrategy):
     UI_COLOR = "#14B8A6"
     UI_ICON = "disk"
 
-    def __init__(self, ram_size: int = 2):
+    def __init__(self, ram_size: int = 2, disk_size: int = 1000):
         """
         Initialize OS-like memory system.
 
         Args:
             ram_size: Maximum number of conversation turns to retain in active memory (RAM)
+            disk_size: Maximum number of paged-out turns kept in passive memory (disk)
         """
         self.ram_size = ram_size
-        self.ram_storage: deque = deque()
-        self.disk_storage: Dict[int, str] = {}
+        self.disk_size = disk_size
+        # Both tiers are ordered least to most recently used
+        self.ram_storage: "OrderedDict[int, str]" = OrderedDict()
+        self.disk_storage: "OrderedDict[int, str]" = OrderedDict()
+        # Paging keys of every stored turn, tokenized once when the turn is added
+        self._page_tokens: Dict[int, FrozenSet[str]] = {}
+        # Inverted index over paged-out turns: word -> turn ids containing it
+        self._disk_word_index: Dict[str, Set[int]] = defaultdict(set)
         self.turn_count = 0
         self.page_fault_log: List[Dict[str, Any]] = []
         self.lru_stats = {"hits": 0, "misses": 0}
@@ -54,6 +70,8 @@ class OSMemory(BaseMemoryStrategy):
 
     def _log_operation(self, op_type: str, details: Dict[str, Any]) -> None:
         """Log operation with [OS_PAGE] prefix."""
+        if not self.LOGGING_ENABLED:
+            return
         self.operation_log.append({
             "type": op_type,
             "timestamp": time.time(),
@@ -83,9 +101,41 @@ class OSMemory(BaseMemoryStrategy):
             "lru_efficiency": round(lru_efficiency, 4)
         }
 
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    def _page_out(self) -> None:
+        """Move the least recently used RAM turn to disk, evicting the oldest disk page if full."""
+        lru_turn_id, lru_turn_data = self.ram_storage.popitem(last=False)
+        if self.disk_storage and len(self.disk_storage) >= self.disk_size:
+            evicted_id, _ = self.disk_storage.popitem(last=False)
+            self._unindex_page(evicted_id)
+            del self._page_tokens[evicted_id]
+            self._log_operation("DISK_EVICT", {"turn_id": evicted_id})
+        self.disk_storage[lru_turn_id] = lru_turn_data
+        for word in self._page_tokens[lru_turn_id]:
+            self._disk_word_index[word].add(lru_turn_id)
+        self._log_operation("PAGE_OUT", {"turn_id": lru_turn_id})
+        print("[OS_PAGE] Paging out turn to passive storage.")
+
+    def _unindex_page(self, turn_id: int) -> None:
+        """Remove a disk page from the inverted word index."""
+        index = self._disk_word_index
+        for word in self._page_tokens[turn_id]:
+            turn_ids = index[word]
+            turn_ids.discard(turn_id)
+            if not turn_ids:
+                del index[word]
+
+    def _page_in(self, turn_id: int) -> str:
+        """Move a disk page back into RAM as its most recently used turn."""
+        data = self.disk_storage.pop(turn_id)
+        self._unindex_page(turn_id)
+        if len(self.ram_storage) >= self.ram_size:
+            self._page_out()
+        self.ram_storage[turn_id] = data
+        return data
+
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
-        Add turn to active memory, page out oldest turn to passive memory if RAM is full.
+        Add turn to active memory, page out the least recently used turn to passive memory if RAM is full.
 
         Args:
             user_input: User's message
@@ -93,38 +143,45 @@ class OSMemory(BaseMemoryStrategy):
         """
         turn_id = self.turn_count
         turn_data = f"User: {user_input}\nAI: {ai_response}"
+        self._page_tokens[turn_id] = _page_words(turn_data)
 
         if len(self.ram_storage) >= self.ram_size:
-            lru_turn_id, lru_turn_data = self.ram_storage.popleft()
-            self.disk_storage[lru_turn_id] = lru_turn_data
-            self._log_operation("PAGE_OUT", {"turn_id": lru_turn_id})
-            print("[OS_PAGE] Paging out turn to passive storage.")
+            self._page_out()
 
-        self.ram_storage.append((turn_id, turn_data))
+        self.ram_storage[turn_id] = turn_data
         self.turn_count += 1
         self._log_operation("ADD_TURN", {"turn_id": turn_id})
 
-    def get_context(self, query: str) -> str:
+    async def get_context(self, query: str) -> str:
         """
         Provide RAM context and simulate page faults by pulling from passive memory if needed.
 
+        RAM turns that match the query are marked as recently used, and
+        matching disk pages are paged back into RAM.
+
         Args:
             query: Current user query
 
         Returns:
             Context from active memory and any paged-in passive memory
         """
-        active_context = "\n".join([data for _, data in self.ram_storage])
-        paged_in_context = ""
-        query_words = [word.lower() for word in query.split() if len(word) > 3]
-
-        for turn_id, data in self.disk_storage.items():
-            if any(word in data.lower() for word in query_words):
-                self._track_page_fault(turn_id, data)
-                paged_in_context += f"\n(Paged in from Turn {turn_id}): {data}"
-                print("[OS_PAGE] Page fault: paging in from passive storage.")
-
-        if paged_in_context:
+        active_context = "\n".join(data for _, data in sorted(self.ram_storage.items()))
+        paged_in_parts: List[str] = []
+        index = self._disk_word_index
+        query_words = _page_words(query)
+        hit_ids = set().union(*(index[word] for word in query_words if word in index))
+
+        for turn_id in [t for t in self.ram_storage if not query_words.isdisjoint(self._page_tokens[t])]:
+            self.ram_storage.move_to_end(turn_id)
+
+        for turn_id in sorted(hit_ids):
+            data = self._page_in(turn_id)
+            self._track_page_fault(turn_id, data)
+            paged_in_parts.append(f"(Paged in from Turn {turn_id}): {data}")
+            print("[OS_PAGE] Page fault: paging in from passive storage.")
+
+        if paged_in_parts:
+            paged_in_context = "\n" + "\n".join(paged_in_parts)
             self.lru_stats["misses"] += 1
             self._log_operation("PAGE_FAULT", {"paged_in": True})
             return f"### Active Memory (RAM):\n{active_context}\n\n### Paged-In from Passive Memory (Disk):\n{paged_in_context}"
@@ -134,7 +191,9 @@ class OSMemory(BaseMemoryStrategy):
     def clear(self) -> None:
         """Clear both active and passive memory storage."""
         self.ram_storage.clear()
-        self.disk_storage = {}
+        self.disk_storage.clear()
+        self._disk_word_index.clear()
+        self._page_tokens.clear()
         self.turn_count = 0
         self.page_fault_log = []
         self.lru_stats = {"hits": 0, "misses": 0}
@@ -6,15 +6,110 @@ It converts conversations into vector embeddings and uses similarity search to f
 the most relevant historical interactions for any given query.
 """
 
+import os
 import time
 import hashlib
 import numpy as np
 import faiss
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from array import array
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Sequence
+from openai import AsyncOpenAI
 from memory_strategy_base import BaseMemoryStrategy
 from memory_utils import generate_embedding, get_openai_client
 
+# Digest size in bytes of embedding cache keys
+KEY_SIZE = 16
+# Training vectors per IVF cell, following FAISS's guidance for k-means
+IVF_TRAINING_POINTS_PER_CELL = 39
+# Product quantizer layout for the "ivfpq" index: sub-vectors per vector, bits per code
+PQ_SUBQUANTIZERS = 8
+PQ_BITS = 8
+
+# OpenMP threads FAISS uses to parallelize batched searches across queries
+faiss.omp_set_num_threads(int(os.getenv("FAISS_THREADS", str(min(4, os.cpu_count() or 1)))))
+
+
+class _EmbeddingStore:
+    """
+    Fixed-capacity float32 matrix of embeddings addressed by cache key.
+
+    With a path, vectors and keys live in memory-mapped files, so cached
+    embeddings survive restarts; otherwise they are held in memory. Lookups
+    return copies, since a later insert may reuse the row. Once full, the
+    least recently used entry's row is reused for the next insert. File-backed
+    writes reach disk on flush(), which callers issue once per batch.
+    """
+
+    def __init__(self, dim: int, capacity: int = 4096, path: Optional[str] = None):
+        self.dim = dim
+        self.capacity = capacity
+        self.path = path
+        self._index: "OrderedDict[bytes, int]" = OrderedDict()
+        if path:
+            files = [(path, np.float32, (capacity, dim)), (path + ".keys", np.uint8, (capacity, KEY_SIZE))]
+            # Reuse the pair only if both files match; a changed dim or capacity
+            # recreates both, so old keys never point at zeroed vectors
+            mode = "r+" if all(self._matches(*spec) for spec in files) else "w+"
+            self._vectors, self._keys = (
+                np.memmap(file, dtype=dtype, mode=mode, shape=shape) for file, dtype, shape in files
+            )
+            for row, key in enumerate(self._keys):
+                if key.any():
+                    self._index[key.tobytes()] = row
+        else:
+            self._vectors = np.empty((min(64, capacity), dim), dtype=np.float32)
+            self._keys = None
+        used = set(self._index.values())
+        # Unused rows, popped lowest first
+        self._free = [row for row in range(capacity - 1, -1, -1) if row not in used]
+
+    @staticmethod
+    def _matches(path: str, dtype: Any, shape: tuple) -> bool:
+        """Whether an existing file has exactly the size of the given array."""
+        expected = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        return os.path.exists(path) and os.path.getsize(path) == expected
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Return the stored vector for a key, or None."""
+        row = self._index.get(key)
+        if row is None:
+            return None
+        self._index.move_to_end(key)
+        return self._vectors[row].copy()
+
+    def put(self, key: bytes, embedding: Sequence[float]) -> None:
+        """Store a vector under a key, evicting the least recently used entry when full."""
+        if key in self._index or self.capacity <= 0:
+            return
+        if self._free:
+            row = self._free.pop()
+        else:
+            _, row = self._index.popitem(last=False)
+        if self._keys is None and row >= len(self._vectors):
+            rows = min(max(2 * len(self._vectors), row + 1), self.capacity)
+            self._vectors = np.concatenate([self._vectors, np.empty((rows - len(self._vectors), self.dim), dtype=np.float32)])
+        self._vectors[row] = embedding
+        if self._keys is not None:
+            self._keys[row] = np.frombuffer(key, dtype=np.uint8)
+        self._index[key] = row
+
+    def flush(self) -> None:
+        """Write pending file-backed inserts to disk; a no-op for in-memory stores."""
+        if self._keys is not None:
+            self._vectors.flush()
+            self._keys.flush()
+
+    def clear(self) -> None:
+        """Drop in-memory entries; a file-backed store keeps its contents."""
+        self.flush()
+        if self._keys is None:
+            self._index.clear()
+            self._free = list(range(self.capacity - 1, -1, -1))
+
 
 class RetrievalMemory(BaseMemoryStrategy):
     """
@@ -41,31 +136,131 @@ class RetrievalMemory(BaseMemoryStrategy):
     UI_COLOR = "#F59E0B"
     UI_ICON = "search"
 
-    def __init__(self, k: int = 2, embedding_dim: int = 1536, client: Optional[OpenAI] = None):
+    def __init__(
+        self,
+        k: int = 2,
+        embedding_dim: int = 1536,
+        ef_search: int = 16,
+        index_type: str = "hnsw",
+        nlist: int = 100,
+        nprobe: int = 8,
+        cache_capacity: int = 4096,
+        cache_path: Optional[str] = None,
+        client: Optional[AsyncOpenAI] = None
+    ):
         """
         Initialize retrieval memory system.
 
         Args:
             k: Number of most relevant documents to retrieve for a given query
             embedding_dim: Dimension of embedding vectors (1536 for text-embedding-3-small)
-            client: Optional OpenAI client instance
+            ef_search: HNSW search breadth; higher improves recall at the cost of latency
+            index_type: "hnsw" for an HNSW graph, or "ivfpq" for an inverted-file index with
+                product quantization, which stores compressed vectors for very large histories
+                (embedding_dim must then be a multiple of PQ_SUBQUANTIZERS)
+            nlist: Number of IVF cells for the "ivfpq" index
+            nprobe: Number of IVF cells searched per query for the "ivfpq" index
+            cache_capacity: Maximum number of cached embeddings before least recently used ones are evicted
+            cache_path: Optional file to memory-map the embedding cache to, so it persists across restarts
+            client: Optional AsyncOpenAI client instance
         """
         self.k = k
         self.embedding_dim = embedding_dim
+        self.ef_search = ef_search
+        if index_type not in ("hnsw", "ivfpq"):
+            raise ValueError(f"Unknown index_type: {index_type}")
+        if index_type == "ivfpq" and embedding_dim % PQ_SUBQUANTIZERS != 0:
+            # FAISS only rejects this at training time, after documents were accepted
+            raise ValueError(
+                f"embedding_dim ({embedding_dim}) must be divisible by {PQ_SUBQUANTIZERS} for the ivfpq index"
+            )
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
         self.client = client or get_openai_client()
-        self.document_registry: List[str] = []
-        self.vector_store = faiss.IndexFlatL2(self.embedding_dim)
-        self.embedding_cache: Dict[str, List[float]] = {}
+        # Documents as one UTF-8 blob; document i spans _doc_offsets[i]:_doc_offsets[i + 1]
+        self._doc_bytes = bytearray()
+        self._doc_offsets = array("q", [0])
+        self.vector_store = self._new_index()
+        self.embedding_cache = _EmbeddingStore(embedding_dim, capacity=cache_capacity, path=cache_path)
         self.retrieval_history: List[Dict[str, Any]] = []
         self.cache_hits = 0
+        self._total_lookups = 0
         self.operation_log: List[Dict[str, Any]] = []
 
-    def _cache_key(self, text: str) -> str:
+    def _new_index(self) -> faiss.Index:
+        """
+        Create an empty index for approximate nearest-neighbour search.
+
+        Vectors are L2-normalized before they reach the index, so inner
+        product ranks by cosine similarity. The "ivfpq" index type starts
+        as an exact flat index until there are enough vectors to train on.
+        """
+        if self.index_type == "ivfpq":
+            return faiss.IndexFlatIP(self.embedding_dim)
+        index = faiss.IndexHNSWFlat(self.embedding_dim, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 40
+        index.hnsw.search_bounded_queue = True
+        faiss.ParameterSpace().set_index_parameter(index, "efSearch", self.ef_search)
+        return index
+
+    def _maybe_train_ivfpq(self) -> None:
+        """Once enough vectors are staged, train the IVF-PQ index on them and switch over."""
+        staged = self.vector_store
+        if not isinstance(staged, faiss.IndexFlatIP) or staged.ntotal < self.nlist * IVF_TRAINING_POINTS_PER_CELL:
+            return
+        vectors = staged.reconstruct_n(0, staged.ntotal)
+        quantizer = faiss.IndexFlatIP(self.embedding_dim)
+        index = faiss.IndexIVFPQ(
+            quantizer, self.embedding_dim, self.nlist, PQ_SUBQUANTIZERS, PQ_BITS, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
+        index.add(vectors)
+        faiss.ParameterSpace().set_index_parameter(index, "nprobe", self.nprobe)
+        self.vector_store = index
+        self._log_operation("TRAIN_INDEX", {"vectors": int(index.ntotal), "nlist": self.nlist})
+
+    @property
+    def document_count(self) -> int:
+        """Number of documents stored in memory."""
+        return len(self._doc_offsets) - 1
+
+    def _get_doc(self, i: int) -> str:
+        """Decode document i from the document blob."""
+        return self._doc_bytes[self._doc_offsets[i]:self._doc_offsets[i + 1]].decode()
+
+    def _cache_key(self, text: str) -> bytes:
         """Generate cache key for embedding lookup."""
-        return hashlib.sha256(text.encode()).hexdigest()
+        return hashlib.blake2b(text.encode(), digest_size=KEY_SIZE).digest()
+
+    async def _embed(self, texts: List[str]) -> List[Any]:
+        """
+        Look up embeddings in the cache, fetching all misses with one request.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One embedding per text (empty when the request failed)
+        """
+        cache_keys = [self._cache_key(text) for text in texts]
+        embeddings: List[Any] = [self.embedding_cache.get(key) for key in cache_keys]
+        self.cache_hits += sum(e is not None for e in embeddings)
+        self._total_lookups += len(cache_keys)
+        uncached = [i for i, e in enumerate(embeddings) if e is None]
+        if uncached:
+            fresh = await generate_embedding([texts[i] for i in uncached], self.client)
+            for i, embedding in zip(uncached, fresh):
+                embeddings[i] = embedding
+                if embedding:
+                    self.embedding_cache.put(cache_keys[i], embedding)
+            self.embedding_cache.flush()
+        return embeddings
 
     def _log_operation(self, op_type: str, details: Dict[str, Any]) -> None:
         """Log operation with [RETRIEVAL] prefix."""
+        if not self.LOGGING_ENABLED:
+            return
         self.operation_log.append({
             "type": op_type,
             "timestamp": time.time(),
@@ -84,21 +279,18 @@ class RetrievalMemory(BaseMemoryStrategy):
 
     def get_cache_efficiency(self) -> float:
         """Cache hit rate (0.0 to 1.0)."""
-        total_lookups = len(self.retrieval_history) + len(self.document_registry) * 2
-        if total_lookups <= 0:
-            return 0.0
-        return self.cache_hits / max(1, total_lookups)
+        return self.cache_hits / self._total_lookups if self._total_lookups else 0.0
 
     def visualize_vector_space(self) -> Dict[str, Any]:
         """Return data for vector space visualization (document count, dimensions)."""
         return {
             "num_vectors": self.vector_store.ntotal,
             "embedding_dim": self.embedding_dim,
-            "document_count": len(self.document_registry),
+            "document_count": self.document_count,
             "cache_size": len(self.embedding_cache)
         }
 
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
         Add new conversation turn to memory.
 
@@ -109,71 +301,111 @@ class RetrievalMemory(BaseMemoryStrategy):
             user_input: User's message
             ai_response: AI's response
         """
-        docs_to_add = [
+        await self.add_documents([
             f"User said: {user_input}",
             f"AI responded: {ai_response}"
-        ]
-        for doc in docs_to_add:
-            cache_key = self._cache_key(doc)
-            if cache_key in self.embedding_cache:
-                self.cache_hits += 1
-                embedding = self.embedding_cache[cache_key]
-            else:
-                embedding = generate_embedding(doc, self.client)
-                if embedding:
-                    self.embedding_cache[cache_key] = embedding
-            if embedding:
-                self.document_registry.append(doc)
-                vector = np.array([embedding], dtype='float32')
-                self.vector_store.add(vector)
-        self._log_operation("ADD_DOCUMENTS", {"docs_added": len(docs_to_add), "total_docs": len(self.document_registry)})
+        ])
 
-    def get_context(self, query: str) -> str:
+    async def add_documents(self, docs_to_add: List[str]) -> None:
         """
-        Find k most relevant documents from memory based on semantic similarity to query.
+        Embed and index documents for retrieval.
 
         Args:
-            query: Current user query to find relevant context for
+            docs_to_add: Documents to store, each embedded and indexed separately
+        """
+        embeddings = await self._embed(docs_to_add)
+        indexed = [(doc, e) for doc, e in zip(docs_to_add, embeddings) if len(e)]
+        if indexed:
+            for doc, _ in indexed:
+                self._doc_bytes += doc.encode()
+                self._doc_offsets.append(len(self._doc_bytes))
+            vectors = np.stack([np.asarray(e, dtype=np.float32) for _, e in indexed])
+            faiss.normalize_L2(vectors)
+            self.vector_store.add(vectors)
+            if self.index_type == "ivfpq":
+                self._maybe_train_ivfpq()
+        self._log_operation("ADD_DOCUMENTS", {"docs_added": len(docs_to_add), "total_docs": self.document_count})
+
+    async def retrieve(self, queries: List[str]) -> List[Optional[List[str]]]:
+        """
+        Find the k most relevant documents for each query with one batched search.
+
+        Args:
+            queries: Queries to find relevant documents for
 
         Returns:
-            Formatted string containing most relevant retrieved information
+            Retrieved documents per query, or None for a query that could not be embedded
         """
         if self.vector_store.ntotal == 0:
-            return "No information in memory yet."
+            return [[] for _ in queries]
 
         start = time.time()
-        cache_key = self._cache_key(query)
-        if cache_key in self.embedding_cache:
-            self.cache_hits += 1
-            query_embedding = self.embedding_cache[cache_key]
-        else:
-            query_embedding = generate_embedding(query, self.client)
-            if query_embedding:
-                self.embedding_cache[cache_key] = query_embedding
-        if not query_embedding:
-            return "Could not process query for retrieval."
-
-        query_vector = np.array([query_embedding], dtype='float32')
-        distances, indices = self.vector_store.search(query_vector, self.k)
-        retrieved_docs = [
-            self.document_registry[i] for i in indices[0]
-            if i != -1 and i < len(self.document_registry)
-        ]
+        embeddings = await self._embed(queries)
+        valid = [i for i, e in enumerate(embeddings) if len(e)]
+        results: List[Optional[List[str]]] = [None] * len(queries)
+        if valid:
+            query_vectors = np.stack([np.asarray(embeddings[i], dtype=np.float32) for i in valid])
+            faiss.normalize_L2(query_vectors)
+            distances, indices = self.vector_store.search(query_vectors, self.k)
+            num_docs = self.document_count
+            for i, row in zip(valid, indices):
+                results[i] = [self._get_doc(j) for j in row if 0 <= j < num_docs]
         elapsed = time.time() - start
-        self._track_retrieval(query, retrieved_docs, elapsed)
-        self._log_operation("RETRIEVE", {"k": self.k, "results": len(retrieved_docs), "elapsed": round(elapsed, 4)})
+        for query, docs in zip(queries, results):
+            if docs is not None:
+                self._track_retrieval(query, docs, elapsed / len(valid))
+        self._log_operation("RETRIEVE", {
+            "k": self.k,
+            "queries": len(queries),
+            "results": sum(len(docs) for docs in results if docs),
+            "elapsed": round(elapsed, 4)
+        })
+        return results
+
+    async def get_contexts(self, queries: List[str]) -> List[str]:
+        """
+        Build a context string for each query from a single batched retrieval.
+
+        Args:
+            queries: Queries to find relevant context for
+
+        Returns:
+            Formatted retrieved information, one string per query
+        """
+        if self.vector_store.ntotal == 0:
+            return ["No information in memory yet."] * len(queries)
+
+        contexts = []
+        for docs in await self.retrieve(queries):
+            if docs is None:
+                contexts.append("Could not process query for retrieval.")
+            elif not docs:
+                contexts.append("Could not find any relevant information in memory.")
+            else:
+                contexts.append("### Relevant Information Retrieved from Memory:\n" + "\n---\n".join(docs))
+        return contexts
+
+    async def get_context(self, query: str) -> str:
+        """
+        Find k most relevant documents from memory based on semantic similarity to query.
+
+        Args:
+            query: Current user query to find relevant context for
 
-        if not retrieved_docs:
-            return "Could not find any relevant information in memory."
-        return "### Relevant Information Retrieved from Memory:\n" + "\n---\n".join(retrieved_docs)
+        Returns:
+            Formatted string containing most relevant retrieved information
+        """
+        return (await self.get_contexts([query]))[0]
 
     def clear(self) -> None:
         """Reset both document storage and FAISS index."""
-        self.document_registry = []
-        self.vector_store = faiss.IndexFlatL2(self.embedding_dim)
-        self.embedding_cache = {}
+        self._doc_bytes = bytearray()
+        self._doc_offsets = array("q", [0])
+        self.vector_store = self._new_index()
+        self.embedding_cache.clear()
         self.retrieval_history = []
         self.cache_hits = 0
+        self._total_lookups = 0
         self.operation_log = []
         print("[RETRIEVAL] Retrieval memory cleared.")
 
@@ -188,7 +420,7 @@ class RetrievalMemory(BaseMemoryStrategy):
         Returns:
             Dictionary containing memory statistics
         """
-        num_docs = len(self.document_registry)
+        num_docs = self.document_count
         num_vectors = self.vector_store.ntotal
         avg_retrieval_time = 0.0
         if self.retrieval_history:
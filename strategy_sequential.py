@@ -7,9 +7,17 @@ scalable as the context grows linearly with each conversation turn.
 """
 
 import time
-from typing import List, Dict, Any
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
 from memory_strategy_base import BaseMemoryStrategy
-from memory_utils import count_tokens
+from memory_utils import Message, count_tokens, count_tokens_batch, make_message
+
+# Most recent operations kept in the operation log
+OPERATION_LOG_SIZE = 1000
+# Most recent turns kept for growth-rate tracking
+GROWTH_TRACKER_SIZE = 100
+# Bound once so the per-turn logging paths skip the module attribute lookup
+_now = time.time
 
 
 class SequentialMemory(BaseMemoryStrategy):
@@ -35,19 +43,30 @@ class SequentialMemory(BaseMemoryStrategy):
     UI_COLOR = "#8B5CF6"
     UI_ICON = "scroll"
 
+    __slots__ = (
+        "full_history_buffer", "_context_cache", "_turns", "total_content_tokens",
+        "total_prompt_tokens", "linear_growth_tracker", "operation_log"
+    )
+
     def __init__(self):
         """Initialize memory with empty list to store conversation history."""
-        self.full_history_buffer: List[Dict[str, str]] = []
+        self.full_history_buffer: List[Message] = []
+        # Rendered history, extended on every turn since nothing is ever evicted
+        self._context_cache = ""
+        # Completed turns, kept alongside the buffer instead of derived from its length
+        self._turns = 0
         self.total_content_tokens = 0
         self.total_prompt_tokens = 0
-        self.linear_growth_tracker: List[Dict[str, Any]] = []
-        self.operation_log: List[Dict[str, Any]] = []
+        self.linear_growth_tracker: deque = deque(maxlen=GROWTH_TRACKER_SIZE)
+        self.operation_log: deque = deque(maxlen=OPERATION_LOG_SIZE)
 
     def _log_operation(self, op_type: str, details: Dict[str, Any]) -> None:
         """Log operation with [SEQUENTIAL] prefix for unique identification."""
+        if not self.LOGGING_ENABLED:
+            return
         entry = {
             "type": op_type,
-            "timestamp": time.time(),
+            "timestamp": _now(),
             "details": details,
             "prefix": "SEQUENTIAL"
         }
@@ -55,35 +74,73 @@ class SequentialMemory(BaseMemoryStrategy):
 
     def _track_linear_growth(self, turn_tokens: int) -> None:
         """Track token growth rate for linear metrics."""
-        total_turns = len(self.full_history_buffer) // 2
         self.linear_growth_tracker.append({
-            "turn": total_turns,
+            "turn": self._turns,
             "tokens_this_turn": turn_tokens,
             "cumulative_tokens": self.total_content_tokens
         })
 
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
         Add new user-AI interaction to history.
 
-        Each interaction is stored as two dictionary entries in the list.
+        Each interaction is stored as two Message entries in the list,
+        each carrying its own token count.
 
         Args:
             user_input: User's message
             ai_response: AI's response
         """
-        turn_tokens = count_tokens(user_input + ai_response)
-        self.full_history_buffer.append({"role": "user", "content": user_input})
-        self.full_history_buffer.append({"role": "assistant", "content": ai_response})
+        user_message = make_message("user", user_input, count_tokens(user_input))
+        ai_message = make_message("assistant", ai_response, count_tokens(ai_response))
+        turn_tokens = user_message.token_count + ai_message.token_count
+        self.full_history_buffer.append(user_message)
+        self.full_history_buffer.append(ai_message)
+        self._turns += 1
+        turn_lines = f"{user_message.formatted}\n{ai_message.formatted}"
+        self._context_cache = f"{self._context_cache}\n{turn_lines}" if self._context_cache else turn_lines
         self.total_content_tokens += turn_tokens
         self._track_linear_growth(turn_tokens)
         self._log_operation("ADD_TURN", {
             "messages_added": 2,
             "turn_tokens": turn_tokens,
-            "total_turns": len(self.full_history_buffer) // 2
+            "total_turns": self._turns
+        })
+
+    async def add_messages_bulk(self, pairs: List[Tuple[str, str]]) -> None:
+        """
+        Add many user-AI interactions at once, e.g. when importing a transcript.
+
+        All messages are tokenized in a single batched call and appended
+        together, instead of one tokenizer call per message.
+
+        Args:
+            pairs: (user_input, ai_response) tuples in chronological order
+        """
+        if not pairs:
+            return
+        contents = [text for pair in pairs for text in pair]
+        token_counts = count_tokens_batch(contents)
+        turn_lines = []
+        for i, (user_input, ai_response) in enumerate(pairs):
+            user_message = make_message("user", user_input, token_counts[2 * i])
+            ai_message = make_message("assistant", ai_response, token_counts[2 * i + 1])
+            turn_tokens = user_message.token_count + ai_message.token_count
+            self.full_history_buffer.append(user_message)
+            self.full_history_buffer.append(ai_message)
+            self._turns += 1
+            turn_lines.append(f"{user_message.formatted}\n{ai_message.formatted}")
+            self.total_content_tokens += turn_tokens
+            self._track_linear_growth(turn_tokens)
+        added = "\n".join(turn_lines)
+        self._context_cache = f"{self._context_cache}\n{added}" if self._context_cache else added
+        self._log_operation("ADD_BULK", {
+            "messages_added": 2 * len(pairs),
+            "bulk_tokens": sum(token_counts),
+            "total_turns": self._turns
         })
 
-    def get_context(self, query: str) -> str:
+    async def get_context(self, query: str) -> str:
         """
         Retrieve entire conversation history formatted as a single string.
 
@@ -96,21 +153,33 @@ class SequentialMemory(BaseMemoryStrategy):
         Returns:
             Complete conversation history as formatted string
         """
-        if not self.full_history_buffer:
-            return "No conversation history yet."
+        return self._context_cache or "No conversation history yet."
+
+    def iter_context(self, query: str) -> Iterator[str]:
+        """
+        Yield the conversation history one formatted line at a time.
+
+        Lets callers that tokenize or slice the history avoid building the
+        full context string. The 'query' parameter is ignored.
 
-        return "\n".join([
-            f"{turn['role'].capitalize()}: {turn['content']}"
-            for turn in self.full_history_buffer
-        ])
+        Args:
+            query: Current user query (ignored in this strategy)
+
+        Yields:
+            One "Role: content" line per stored message
+        """
+        for message in self.full_history_buffer:
+            yield message.formatted
 
     def clear(self) -> None:
         """Reset conversation history by clearing the list."""
         self.full_history_buffer = []
+        self._context_cache = ""
+        self._turns = 0
         self.total_content_tokens = 0
         self.total_prompt_tokens = 0
-        self.linear_growth_tracker = []
-        self.operation_log = []
+        self.linear_growth_tracker.clear()
+        self.operation_log.clear()
         print("[SEQUENTIAL] Sequential memory cleared.")
 
     def get_operation_log(self) -> List[Dict[str, Any]]:
@@ -125,11 +194,11 @@ class SequentialMemory(BaseMemoryStrategy):
             Dictionary containing memory statistics
         """
         total_messages = len(self.full_history_buffer)
-        total_turns = total_messages // 2
+        total_turns = self._turns
         growth_rate = 0.0
         projected_next_size = total_messages
         if len(self.linear_growth_tracker) >= 2:
-            recent = self.linear_growth_tracker[-5:]
+            recent = list(self.linear_growth_tracker)[-5:]
             tokens_added = sum(t["tokens_this_turn"] for t in recent)
             growth_rate = tokens_added / len(recent) if recent else 0
             projected_next_size = total_messages + 2 if growth_rate > 0 else total_messages
@@ -7,9 +7,12 @@ window. It prevents unbounded context growth but may lose important historical i
 
 import time
 from collections import deque
-from typing import List, Dict, Any, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from memory_strategy_base import BaseMemoryStrategy
-from memory_utils import count_tokens
+from memory_utils import Message, count_tokens, make_message
+
+# Local alias for the timestamp calls made on every add and eviction
+_now = time.time
 
 
 class SlidingWindowMemory(BaseMemoryStrategy):
@@ -35,6 +38,11 @@ class SlidingWindowMemory(BaseMemoryStrategy):
     UI_COLOR = "#3B82F6"
     UI_ICON = "window"
 
+    __slots__ = (
+        "window_size", "circular_buffer", "total_content_tokens", "total_prompt_tokens",
+        "eviction_count", "eviction_log", "window_efficiency_tracker", "operation_log"
+    )
+
     def __init__(self, window_size: int = 4):
         """
         Initialize memory with fixed-size deque.
@@ -44,7 +52,8 @@ class SlidingWindowMemory(BaseMemoryStrategy):
                         A single turn includes one user message and one AI response.
         """
         self.window_size = window_size
-        self.circular_buffer: deque = deque(maxlen=window_size)
+        # Flat message deque; each turn occupies two consecutive slots (user, assistant)
+        self.circular_buffer: deque = deque(maxlen=2 * max(window_size, 0))
         self.total_content_tokens = 0
         self.total_prompt_tokens = 0
         self.eviction_count = 0
@@ -54,65 +63,71 @@ class SlidingWindowMemory(BaseMemoryStrategy):
 
     def _log_operation(self, op_type: str, details: Dict[str, Any]) -> None:
         """Log operation with [WINDOW] prefix for unique identification."""
+        if not self.LOGGING_ENABLED:
+            return
         entry = {
             "type": op_type,
-            "timestamp": time.time(),
+            "timestamp": _now(),
             "details": details,
             "prefix": "WINDOW"
         }
         self.operation_log.append(entry)
 
-    def _track_eviction(self, evicted_turn: List[Dict[str, str]]) -> None:
+    def _track_eviction(self, evicted_turn: List[Message]) -> None:
         """Log what was evicted when window is full."""
-        self.eviction_count += 1
-        summary = ""
-        for msg in evicted_turn:
-            summary += msg.get("content", "")[:50] + "... "
+        eviction_id = self.eviction_count = self.eviction_count + 1
+        summary = " ".join(f"{msg.content[:50]}..." for msg in evicted_turn)
         self.eviction_log.append({
-            "eviction_id": self.eviction_count,
-            "turn_preview": summary.strip(),
-            "timestamp": time.time()
+            "eviction_id": eviction_id,
+            "turn_preview": summary,
+            "timestamp": _now()
         })
-        self._log_operation("EVICTION", {"eviction_id": self.eviction_count, "preview": summary[:80]})
+        self._log_operation("EVICTION", {"eviction_id": eviction_id, "preview": summary[:80]})
 
     def _calculate_window_efficiency(self) -> float:
         """Utilization percentage: how full the window is (0.0 to 1.0)."""
         if self.window_size <= 0:
             return 0.0
-        return len(self.circular_buffer) / self.window_size
+        return self._turn_count() / self.window_size
 
-    def peek_oldest_entry(self) -> Optional[List[Dict[str, str]]]:
-        """View next item to be evicted (oldest in window), or None if empty."""
+    def _turn_count(self) -> int:
+        """Number of turns currently in the window."""
+        return len(self.circular_buffer) // 2
+
+    def peek_oldest_entry(self) -> Optional[List[Message]]:
+        """
+        View next turn to be evicted (oldest in window), or None if empty.
+
+        The returned messages are the stored (immutable) Message tuples, not copies.
+        """
         if not self.circular_buffer:
             return None
-        return list(self.circular_buffer[0]) if self.circular_buffer else None
+        return [self.circular_buffer[0], self.circular_buffer[1]]
 
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
         Add new conversation turn to history.
 
-        If deque is full, the oldest turn is automatically removed.
+        If the window is full, the oldest turn's two messages are removed and logged.
 
         Args:
             user_input: User's message
             ai_response: AI's response
         """
-        if len(self.circular_buffer) >= self.window_size and self.window_size > 0:
-            oldest = self.peek_oldest_entry()
-            if oldest:
-                self._track_eviction(oldest)
-
-        turn_data = [
-            {"role": "user", "content": user_input},
-            {"role": "assistant", "content": ai_response}
-        ]
-        self.circular_buffer.append(turn_data)
+        buffer = self.circular_buffer
+        if self.window_size > 0 and len(buffer) == buffer.maxlen:
+            # Pop the oldest turn ourselves so the appends below never evict
+            self._track_eviction([buffer.popleft(), buffer.popleft()])
+
+        buffer.append(make_message("user", user_input))
+        buffer.append(make_message("assistant", ai_response))
         self.total_content_tokens += count_tokens(user_input + ai_response)
         eff = self._calculate_window_efficiency()
-        self.window_efficiency_tracker.append({"utilization": eff, "turns": len(self.circular_buffer)})
-        self._log_operation("ADD_TURN", {"utilization": eff, "turns": len(self.circular_buffer)})
+        turns = self._turn_count()
+        self.window_efficiency_tracker.append({"utilization": eff, "turns": turns})
+        self._log_operation("ADD_TURN", {"utilization": eff, "turns": turns})
 
-    def get_context(self, query: str) -> str:
+    async def get_context(self, query: str) -> str:
         """
         Retrieve conversation history within current window.
 
@@ -127,11 +142,20 @@ class SlidingWindowMemory(BaseMemoryStrategy):
         if not self.circular_buffer:
             return "No conversation history yet."
 
-        context_list = []
-        for turn in self.circular_buffer:
-            for message in turn:
-                context_list.append(f"{message['role'].capitalize()}: {message['content']}")
-        return "\n".join(context_list)
+        return "\n".join(self.iter_context(query))
+
+    def iter_context(self, query: str) -> Iterator[str]:
+        """
+        Yield the messages in the current window one formatted line at a time.
+
+        Args:
+            query: Current user query (ignored in this strategy)
+
+        Yields:
+            One "Role: content" line per message, oldest first
+        """
+        for message in self.circular_buffer:
+            yield message.formatted
 
     def clear(self) -> None:
         """Reset conversation history by clearing the deque."""
@@ -155,8 +179,8 @@ class SlidingWindowMemory(BaseMemoryStrategy):
         Returns:
             Dictionary containing memory statistics
         """
-        current_turns = len(self.circular_buffer)
-        total_messages = sum(len(turn) for turn in self.circular_buffer)
+        total_messages = len(self.circular_buffer)
+        current_turns = total_messages // 2
         efficiency = self._calculate_window_efficiency()
         is_full = current_turns == self.window_size and self.window_size > 0
 
@@ -7,10 +7,36 @@ reaches a threshold, using LLM to compress historical information intelligently.
 """
 
 import time
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
 from memory_strategy_base import BaseMemoryStrategy
-from memory_utils import generate_text, get_openai_client
+from memory_utils import Message, generate_text, get_openai_client, count_tokens, make_message, tokenizer
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Consolidation results kept for replay of identical (summary, buffer) inputs
+CONSOLIDATION_CACHE_SIZE = 256
+
+# Timestamp source for the operation and consolidation logs, bound once
+_now = time.time
+
+# Marker left where the middle of an over-budget summary was cut
+_TRUNCATION_MARKER = "\n...[TRUNCATED]...\n"
+
+# Fixed instructions sent ahead of every consolidation so the provider can cache the prefix
+_SUMMARIZATION_INSTRUCTIONS = (
+    "You are a summarization expert. Your task is to create a concise summary of a conversation. "
+    "Combine the 'Previous Summary' with the 'New Conversation' into a single, updated summary. "
+    "Capture all key facts, names, decisions, and important details.\n\n"
+)
+
+_SUMMARIZATION_PROMPT = (
+    "### Previous Summary:\n{prev}\n\n"
+    "### New Conversation:\n{conv}\n\n"
+    "### Updated Summary:"
+)
 
 
 class SummarizationMemory(BaseMemoryStrategy):
@@ -38,41 +64,64 @@ class SummarizationMemory(BaseMemoryStrategy):
     UI_COLOR = "#10B981"
     UI_ICON = "doc"
 
-    def __init__(self, summary_threshold: int = 4, client: Optional[OpenAI] = None):
+    __slots__ = (
+        "summary_threshold", "max_context_tokens", "client", "cumulative_summary",
+        "_summary_tokens", "_buffer_tokens", "pending_turns_buffer", "summary_versions",
+        "consolidation_events", "_consol_cache", "operation_log"
+    )
+
+    def __init__(
+        self,
+        summary_threshold: int = 4,
+        max_context_tokens: int = 4000,
+        client: Optional["AsyncOpenAI"] = None
+    ):
         """
         Initialize summarization memory.
 
         Args:
             summary_threshold: Number of messages to accumulate before triggering summary
-            client: Optional OpenAI client instance
+            max_context_tokens: Token budget for the context; an over-budget summary
+                is cut from the middle, keeping its beginning and end
+            client: Optional AsyncOpenAI client instance; the shared client is
+                fetched on the first consolidation if omitted
         """
         self.summary_threshold = summary_threshold
-        self.client = client or get_openai_client()
+        self.max_context_tokens = max_context_tokens
+        self.client = client
         self.cumulative_summary = ""
-        self.pending_turns_buffer: List[Dict[str, str]] = []
+        self._summary_tokens = 0
+        self._buffer_tokens = 0
+        self.pending_turns_buffer: List[Message] = []
         self.summary_versions: List[Dict[str, Any]] = []
         self.consolidation_events: List[Dict[str, Any]] = []
+        self._consol_cache: "OrderedDict[bytes, str]" = OrderedDict()
         self.operation_log: List[Dict[str, Any]] = []
 
     def _log_operation(self, op_type: str, details: Dict[str, Any]) -> None:
         """Log operation with [SUMMARIZE] prefix for unique identification."""
+        if not self.LOGGING_ENABLED:
+            return
         self.operation_log.append({
             "type": op_type,
-            "timestamp": time.time(),
+            "timestamp": _now(),
             "details": details,
             "prefix": "SUMMARIZE"
         })
 
-    def _track_consolidation_event(self, buffer_size: int, new_summary_length: int) -> None:
+    def _track_consolidation_event(self, buffer_size: int, new_summary_length: int, cached_tokens: int = 0) -> None:
         """Log when summaries happen."""
-        self.consolidation_events.append({
-            "event_id": len(self.consolidation_events) + 1,
+        events = self.consolidation_events
+        events.append({
+            "event_id": len(events) + 1,
             "buffer_messages_consumed": buffer_size,
             "new_summary_length": new_summary_length,
-            "timestamp": time.time()
+            "cached_prompt_tokens": cached_tokens,
+            "timestamp": _now()
         })
-        self.summary_versions.append({
-            "version": len(self.summary_versions) + 1,
+        versions = self.summary_versions
+        versions.append({
+            "version": len(versions) + 1,
             "length": new_summary_length
         })
 
@@ -86,7 +135,7 @@ class SummarizationMemory(BaseMemoryStrategy):
             return min(1.0, length / 500.0)
         return min(1.0, (length / 300.0 + consolidations * 0.1) / 2.0)
 
-    def add_message(self, user_input: str, ai_response: str) -> None:
+    async def add_message(self, user_input: str, ai_response: str) -> None:
         """
         Add new user-AI interaction to buffer.
 
@@ -96,42 +145,53 @@ class SummarizationMemory(BaseMemoryStrategy):
             user_input: User's message
             ai_response: AI's response
         """
-        self.pending_turns_buffer.append({"role": "user", "content": user_input})
-        self.pending_turns_buffer.append({"role": "assistant", "content": ai_response})
+        for role, content in (("user", user_input), ("assistant", ai_response)):
+            message = make_message(role, content, count_tokens(content))
+            self.pending_turns_buffer.append(message)
+            self._buffer_tokens += message.token_count
         self._log_operation("ADD_TURN", {"buffer_size": len(self.pending_turns_buffer)})
 
         if len(self.pending_turns_buffer) >= self.summary_threshold:
-            self._consolidate_memory()
+            await self._consolidate_memory()
 
-    def _consolidate_memory(self) -> None:
+    async def _consolidate_memory(self) -> None:
         """
         Use LLM to summarize buffer contents and merge with existing summary.
         """
         buffer_size = len(self.pending_turns_buffer)
-        buffer_text = "\n".join([
-            f"{msg['role'].capitalize()}: {msg['content']}"
-            for msg in self.pending_turns_buffer
-        ])
-        summarization_prompt = (
-            f"You are a summarization expert. Your task is to create a concise summary of a conversation. "
-            f"Combine the 'Previous Summary' with the 'New Conversation' into a single, updated summary. "
-            f"Capture all key facts, names, decisions, and important details.\n\n"
-            f"### Previous Summary:\n{self.cumulative_summary}\n\n"
-            f"### New Conversation:\n{buffer_text}\n\n"
-            f"### Updated Summary:"
-        )
-        new_summary = generate_text(
-            "You are an expert summarization engine.",
-            summarization_prompt,
-            self.client
-        )
+        buffer_text = "\n".join(msg.formatted for msg in self.pending_turns_buffer)
+        cache_key = hashlib.blake2b(
+            f"{self.cumulative_summary}||{buffer_text}".encode(), digest_size=16
+        ).digest()
+        usage: Dict[str, int] = {}
+        new_summary = self._consol_cache.get(cache_key)
+        if new_summary is not None:
+            self._consol_cache.move_to_end(cache_key)
+            self._log_operation("CACHE_HIT", {"buffer_size": buffer_size})
+        else:
+            if self.client is None:
+                self.client = get_openai_client()
+            summarization_prompt = _SUMMARIZATION_PROMPT.format(prev=self.cumulative_summary, conv=buffer_text)
+            new_summary = await generate_text(
+                "You are an expert summarization engine.",
+                summarization_prompt,
+                self.client,
+                static_prefix=_SUMMARIZATION_INSTRUCTIONS,
+                usage=usage
+            )
+            if not new_summary.startswith("Error generating text"):
+                self._consol_cache[cache_key] = new_summary
+                if len(self._consol_cache) > CONSOLIDATION_CACHE_SIZE:
+                    self._consol_cache.popitem(last=False)
         self.cumulative_summary = new_summary
-        self._track_consolidation_event(buffer_size, len(new_summary))
+        self._summary_tokens = count_tokens(new_summary)
+        self._track_consolidation_event(buffer_size, len(new_summary), usage.get("cached_tokens", 0))
         self.pending_turns_buffer = []
+        self._buffer_tokens = 0
         self._log_operation("CONSOLIDATE", {"buffer_consumed": buffer_size, "summary_length": len(new_summary)})
         print("[SUMMARIZE] Memory consolidation triggered; new summary generated.")
 
-    def get_context(self, query: str) -> str:
+    async def get_context(self, query: str) -> str:
         """
         Construct context to send to LLM by combining long-term summary
         with short-term buffer of recent messages.
@@ -142,17 +202,38 @@ class SummarizationMemory(BaseMemoryStrategy):
         Returns:
             Combined context from summary and recent messages
         """
-        buffer_text = "\n".join([
-            f"{msg['role'].capitalize()}: {msg['content']}"
-            for msg in self.pending_turns_buffer
-        ])
+        buffer_text = "\n".join(msg.formatted for msg in self.pending_turns_buffer)
         if self.cumulative_summary:
-            return f"### Summary of Past Conversation:\n{self.cumulative_summary}\n\n### Recent Messages:\n{buffer_text}"
+            summary = self._fit_summary(self.max_context_tokens - self._buffer_tokens)
+            return f"### Summary of Past Conversation:\n{summary}\n\n### Recent Messages:\n{buffer_text}"
         return f"### Recent Messages:\n{buffer_text}" if buffer_text else "No conversation history yet."
 
+    def _fit_summary(self, budget: int) -> str:
+        """
+        Return the summary, cut from the middle if it exceeds the token budget.
+
+        Args:
+            budget: Tokens available to the summary
+
+        Returns:
+            The full summary, or its first and last tokens around a truncation marker
+        """
+        if self._summary_tokens <= budget:
+            return self.cumulative_summary
+        tokens = tokenizer.encode_ordinary(self.cumulative_summary)
+        head = max(budget, 0) // 2
+        tail = max(budget, 0) - head
+        self._log_operation("TRUNCATE", {"summary_tokens": len(tokens), "kept_tokens": head + tail})
+        return (
+            tokenizer.decode(tokens[:head]) + _TRUNCATION_MARKER
+            + (tokenizer.decode(tokens[-tail:]) if tail else "")
+        )
+
     def clear(self) -> None:
         """Reset both summary and buffer."""
         self.cumulative_summary = ""
+        self._summary_tokens = 0
+        self._buffer_tokens = 0
         self.pending_turns_buffer = []
         self.summary_versions = []
         self.consolidation_events = []